@@ -226,3 +226,1304 @@ print(columns)
 def game_logic(state, neighbors):
     # Do some blocking input/output in here:
     data = my_socket.recv(100)
+
+
+# Example 10
+# Restore the working version of this function
+def game_logic(state, neighbors):
+    if state == ALIVE:
+        if neighbors < 2:
+            return EMPTY     # Die: Too few
+        elif neighbors > 3:
+            return EMPTY     # Die: Too many
+    else:
+        if neighbors == 3:
+            return ALIVE     # Regenerate
+    return state
+
+# Bit positions of the 3x3 neighborhood, one column of
+# three cells at a time, so the center cell is bit 4.
+NEIGHBORHOOD_BITS = {
+    (dy, dx): 3 * (dx + 1) + (dy + 1)
+    for dx in (-1, 0, 1)
+    for dy in (-1, 0, 1)
+}
+CENTER_BIT = NEIGHBORHOOD_BITS[0, 0]
+
+class Rule:
+    def __init__(self, rulestring='B3/S23'):
+        self.rulestring = rulestring
+        self.birth, self.survival = self._parse(rulestring)
+        if 0 in self.birth:
+            raise ValueError(
+                f'B0 rules are not supported: {rulestring!r}')
+
+        table = bytearray(512)
+        for index in range(512):
+            neighbors = bin(index & ~(1 << CENTER_BIT)).count('1')
+            if index >> CENTER_BIT & 1:
+                table[index] = neighbors in self.survival
+            else:
+                table[index] = neighbors in self.birth
+        self.table = bytes(table)
+
+        self.next_states = {}
+        for state, counts in ((EMPTY, self.birth),
+                              (ALIVE, self.survival)):
+            for neighbors in range(9):
+                if neighbors in counts:
+                    next_state = ALIVE
+                else:
+                    next_state = EMPTY
+                self.next_states[state, neighbors] = next_state
+
+    @staticmethod
+    def _parse(rulestring):
+        try:
+            birth, survival = rulestring.upper().split('/')
+            if birth[0] != 'B' or survival[0] != 'S':
+                raise ValueError
+            birth = frozenset(int(c) for c in birth[1:])
+            survival = frozenset(int(c) for c in survival[1:])
+        except (ValueError, IndexError):
+            raise ValueError(f'Invalid rule: {rulestring!r}')
+        if any(n > 8 for n in birth | survival):
+            raise ValueError(f'Invalid rule: {rulestring!r}')
+        return birth, survival
+
+    def next_state(self, state, neighbors):
+        return self.next_states[state, neighbors]
+
+    def __repr__(self):
+        return f'Rule({self.rulestring!r})'
+
+LIFE = Rule('B3/S23')
+
+for state in (EMPTY, ALIVE):
+    for neighbors in range(9):
+        assert (LIFE.next_state(state, neighbors) ==
+                game_logic(state, neighbors))
+
+for rulestring in ('B3', 'B3/23', 'B9/S23', 'B0/S8'):
+    try:
+        Rule(rulestring)
+    except ValueError:
+        pass  # Expected
+    else:
+        assert False, rulestring
+
+
+# Example 11
+def neighborhood(y, x, get):
+    index = 0
+    for (dy, dx), bit in NEIGHBORHOOD_BITS.items():
+        if get(y + dy, x + dx) == ALIVE:
+            index |= 1 << bit
+    return index
+
+def simulate_rule(grid, rule=LIFE):
+    height, width = grid.height, grid.width
+    table = rule.table
+    next_grid = Grid(height, width)
+    for y in range(height):
+        above = grid.rows[(y - 1) % height]
+        row = grid.rows[y]
+        below = grid.rows[(y + 1) % height]
+        # Each column of the 3x3 window as three bits
+        columns = [
+            (above[x] == ALIVE) |
+            (row[x] == ALIVE) << 1 |
+            (below[x] == ALIVE) << 2
+            for x in range(width)
+        ]
+        next_row = next_grid.rows[y]
+        for x in range(width):
+            index = (columns[x - 1] |
+                     columns[x] << 3 |
+                     columns[(x + 1) % width] << 6)
+            if table[index]:
+                next_row[x] = ALIVE
+    return next_grid
+
+grid = Grid(5, 9)
+grid.set(0, 3, ALIVE)
+grid.set(1, 4, ALIVE)
+grid.set(2, 2, ALIVE)
+grid.set(2, 3, ALIVE)
+grid.set(2, 4, ALIVE)
+assert neighborhood(1, 3, grid.get) == 0b110_101_100
+
+for _ in range(5):
+    assert str(simulate_rule(grid)) == str(simulate(grid))
+    grid = simulate(grid)
+
+
+# Example 12
+import numpy as np
+
+class ArrayGrid:
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.cells = np.zeros((height, width), dtype=np.uint8)
+
+    def get(self, y, x):
+        if self.cells[y % self.height, x % self.width]:
+            return ALIVE
+        return EMPTY
+
+    def set(self, y, x, state):
+        alive = state == ALIVE
+        self.cells[y % self.height, x % self.width] = alive
+
+    def __str__(self):
+        chars = np.frombuffer(
+            (EMPTY + ALIVE).encode(), dtype=np.uint8)
+        lines = np.empty(
+            (self.height, self.width + 1), dtype=np.uint8)
+        lines[:, :-1] = chars[self.cells]
+        lines[:, -1] = ord('\n')
+        return lines.tobytes().decode()
+
+
+# Example 13
+def neighborhood_array(cells):
+    index = np.zeros(cells.shape, dtype=np.uint16)
+    for (dy, dx), bit in NEIGHBORHOOD_BITS.items():
+        # Shift the cell at (y + dy, x + dx) to (y, x)
+        shifted = np.roll(cells, (-dy, -dx), axis=(0, 1))
+        index |= shifted.astype(np.uint16) << bit
+    return index
+
+def simulate_array(grid, rule=LIFE):
+    table = np.frombuffer(rule.table, dtype=np.uint8)
+    next_grid = ArrayGrid(grid.height, grid.width)
+    next_grid.cells = table[neighborhood_array(grid.cells)]
+    return next_grid
+
+
+# Example 14
+def random_grid(grid_type, height, width, density=0.3):
+    grid = grid_type(height, width)
+    for y in range(height):
+        for x in range(width):
+            if random.random() < density:
+                grid.set(y, x, ALIVE)
+    return grid
+
+def copy_grid(grid, grid_type):
+    result = grid_type(grid.height, grid.width)
+    for y in range(grid.height):
+        for x in range(grid.width):
+            result.set(y, x, grid.get(y, x))
+    return result
+
+grid = random_grid(Grid, 20, 30)
+array_grid = copy_grid(grid, ArrayGrid)
+assert str(array_grid) == str(grid)
+
+for i in range(10):
+    grid = simulate(grid)
+    array_grid = simulate_array(array_grid)
+    assert str(array_grid) == str(grid), i
+
+assert array_grid.get(-1, -1) == grid.get(-1, -1)
+
+
+# Example 15
+import timeit
+
+grid = random_grid(Grid, 100, 100)
+array_grid = copy_grid(grid, ArrayGrid)
+
+serial_time = timeit.timeit(lambda: simulate(grid), number=1)
+array_time = timeit.timeit(
+    lambda: simulate_array(array_grid), number=1)
+print(f'Serial: {serial_time:.4f}s, '
+      f'Array: {array_time:.4f}s, '
+      f'{serial_time / array_time:.0f}x speedup')
+
+
+# Example 16
+class BitGrid:
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        # Each row is padded out to whole 64-bit words
+        self.row_bytes = (width + 63) // 64 * 8
+        self.data = bytearray(height * self.row_bytes)
+
+    def _locate(self, y, x):
+        y %= self.height
+        x %= self.width
+        return y * self.row_bytes + x // 8, x % 8
+
+    def get(self, y, x):
+        index, bit = self._locate(y, x)
+        if self.data[index] >> bit & 1:
+            return ALIVE
+        return EMPTY
+
+    def set(self, y, x, state):
+        index, bit = self._locate(y, x)
+        if state == ALIVE:
+            self.data[index] |= 1 << bit
+        else:
+            self.data[index] &= ~(1 << bit)
+
+    def get_row(self, y):
+        start = y * self.row_bytes
+        end = start + self.row_bytes
+        return int.from_bytes(self.data[start:end], 'little')
+
+    def set_row(self, y, bits):
+        start = y * self.row_bytes
+        end = start + self.row_bytes
+        self.data[start:end] = bits.to_bytes(
+            self.row_bytes, 'little')
+
+    def __str__(self):
+        output = []
+        for y in range(self.height):
+            bits = self.get_row(y)
+            for x in range(self.width):
+                output.append(ALIVE if bits >> x & 1 else EMPTY)
+            output.append('\n')
+        return ''.join(output)
+
+
+# Example 17
+def add_bit_planes(planes):
+    counts = [0, 0, 0, 0]  # Bit-sliced neighbor count
+    for plane in planes:
+        carry = plane
+        for i, total in enumerate(counts):
+            counts[i] = total ^ carry
+            carry = total & carry
+    return counts
+
+def match_count(counts, n, mask):
+    result = mask
+    for i, plane in enumerate(counts):
+        if n >> i & 1:
+            result &= plane
+        else:
+            result &= ~plane
+    return result
+
+def step_row(above, row, below, width, rule):
+    mask = (1 << width) - 1
+    planes = [above, below]
+    for bits in (above, row, below):
+        west = (bits << 1 | bits >> (width - 1)) & mask
+        east = bits >> 1 | (bits & 1) << (width - 1)
+        planes.extend((west, east))
+
+    counts = add_bit_planes(planes)
+    next_row = 0
+    for state_bits, alive_counts in ((~row & mask, rule.birth),
+                                     (row, rule.survival)):
+        for n in alive_counts:
+            next_row |= state_bits & match_count(counts, n, mask)
+    return next_row
+
+def simulate_bits(grid, rule=LIFE):
+    next_grid = BitGrid(grid.height, grid.width)
+    first = grid.get_row(0)
+    above = grid.get_row(grid.height - 1)
+    row = first
+    for y in range(grid.height):
+        if y + 1 < grid.height:
+            below = grid.get_row(y + 1)
+        else:
+            below = first
+        next_row = step_row(
+            above, row, below, grid.width, rule)
+        next_grid.set_row(y, next_row)
+        above, row = row, below
+    return next_grid
+
+
+# Example 18
+grid = random_grid(Grid, 20, 70)
+bit_grid = copy_grid(grid, BitGrid)
+assert str(bit_grid) == str(grid)
+
+# Existing callers of simulate() keep working
+assert str(simulate(bit_grid)) == str(simulate(grid))
+
+for i in range(10):
+    grid = simulate(grid)
+    bit_grid = simulate_bits(bit_grid)
+    assert str(bit_grid) == str(grid), i
+
+for height, width in [(1, 1), (2, 3), (3, 64), (4, 65)]:
+    grid = random_grid(Grid, height, width, density=0.5)
+    bit_grid = copy_grid(grid, BitGrid)
+    for i in range(4):
+        grid = simulate(grid)
+        bit_grid = simulate_bits(bit_grid)
+        assert str(bit_grid) == str(grid), (height, width, i)
+
+bit_grid = BitGrid(1000, 1000)
+print(f'{len(bit_grid.data)} bytes for '
+      f'{bit_grid.height * bit_grid.width} cells')
+
+
+# Example 19
+from collections import Counter
+
+class SparseGrid:
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.alive = set()
+
+    def get(self, y, x):
+        if (y % self.height, x % self.width) in self.alive:
+            return ALIVE
+        return EMPTY
+
+    def set(self, y, x, state):
+        position = (y % self.height, x % self.width)
+        if state == ALIVE:
+            self.alive.add(position)
+        else:
+            self.alive.discard(position)
+
+    @classmethod
+    def from_grid(cls, grid):
+        result = cls(grid.height, grid.width)
+        for y in range(grid.height):
+            for x in range(grid.width):
+                if grid.get(y, x) == ALIVE:
+                    result.alive.add((y, x))
+        return result
+
+    def to_grid(self):
+        grid = Grid(self.height, self.width)
+        for y, x in self.alive:
+            grid.set(y, x, ALIVE)
+        return grid
+
+    def __str__(self):
+        return str(self.to_grid())
+
+
+# Example 20
+NEIGHBOR_OFFSETS = [
+    (dy, dx)
+    for dy in (-1, 0, 1)
+    for dx in (-1, 0, 1)
+    if dy or dx
+]
+
+def simulate_sparse(grid, rule=LIFE):
+    height, width = grid.height, grid.width
+    counts = Counter()
+    for y, x in grid.alive:
+        for dy, dx in NEIGHBOR_OFFSETS:
+            counts[(y + dy) % height, (x + dx) % width] += 1
+
+    next_grid = SparseGrid(height, width)
+    # Only live cells and their neighbors can change state
+    for position in grid.alive | counts.keys():
+        if position in grid.alive:
+            state = ALIVE
+        else:
+            state = EMPTY
+        if rule.next_state(state, counts[position]) == ALIVE:
+            next_grid.alive.add(position)
+    return next_grid
+
+
+# Example 21
+for height, width, density in [(20, 30, 0.3),
+                               (50, 60, 0.01),
+                               (1, 1, 1),
+                               (2, 3, 0.5)]:
+    grid = random_grid(Grid, height, width, density)
+    sparse_grid = SparseGrid.from_grid(grid)
+    assert str(sparse_grid) == str(grid)
+    for i in range(10):
+        grid = simulate(grid)
+        sparse_grid = simulate_sparse(sparse_grid)
+        assert str(sparse_grid) == str(grid), (height, width, i)
+    assert str(sparse_grid.to_grid()) == str(grid)
+
+sparse_grid = SparseGrid(4096, 4096)
+sparse_grid.set(0, 3, ALIVE)
+sparse_grid.set(1, 4, ALIVE)
+sparse_grid.set(2, 2, ALIVE)
+sparse_grid.set(2, 3, ALIVE)
+sparse_grid.set(2, 4, ALIVE)
+
+sparse_time = timeit.timeit(
+    lambda: simulate_sparse(sparse_grid), number=100)
+print(f'Sparse 4096x4096 glider: '
+      f'{sparse_time / 100 * 1e6:.0f}us per generation')
+
+
+# Example 22
+class Node:
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+class HashLife:
+    def __init__(self, max_nodes=1_000_000, rule=LIFE):
+        self.max_nodes = max_nodes
+        self.rule = rule
+        self.nodes = {}
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+        self.collections = 0
+        self.peak_nodes = 0
+        self.peak_results = 0
+        self.empty_leaf = Node(0, None, None, None, None, 0)
+        self.alive_leaf = Node(0, None, None, None, None, 1)
+        self.empty_nodes = [self.empty_leaf]
+
+    def leaf(self, state):
+        if state == ALIVE:
+            return self.alive_leaf
+        return self.empty_leaf
+
+    def join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            population = (nw.population + ne.population +
+                          sw.population + se.population)
+            node = Node(nw.level + 1, nw, ne, sw, se, population)
+            self.nodes[key] = node
+        return node
+
+    def empty(self, level):
+        while len(self.empty_nodes) <= level:
+            node = self.empty_nodes[-1]
+            self.empty_nodes.append(
+                self.join(node, node, node, node))
+        return self.empty_nodes[level]
+
+
+# Example 23
+    def _step_level2(self, node):
+        cells = [[None] * 4 for _ in range(4)]
+        quadrants = ((0, 0, node.nw), (0, 2, node.ne),
+                     (2, 0, node.sw), (2, 2, node.se))
+        for y, x, quadrant in quadrants:
+            cells[y][x] = quadrant.nw.population
+            cells[y][x + 1] = quadrant.ne.population
+            cells[y + 1][x] = quadrant.sw.population
+            cells[y + 1][x + 1] = quadrant.se.population
+
+        next_leaves = []
+        for y in (1, 2):
+            for x in (1, 2):
+                index = 0
+                for (dy, dx), bit in NEIGHBORHOOD_BITS.items():
+                    index |= cells[y + dy][x + dx] << bit
+                if self.rule.table[index]:
+                    next_leaves.append(self.alive_leaf)
+                else:
+                    next_leaves.append(self.empty_leaf)
+        return self.join(*next_leaves)
+
+    def _centered(self, node):
+        # The nine overlapping sub-nodes one level down
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        join = self.join
+        return [
+            nw,
+            join(nw.ne, ne.nw, nw.se, ne.sw),
+            ne,
+            join(nw.sw, nw.se, sw.nw, sw.ne),
+            join(nw.se, ne.sw, sw.ne, se.nw),
+            join(ne.sw, ne.se, se.nw, se.ne),
+            sw,
+            join(sw.ne, se.nw, sw.se, se.sw),
+            se,
+        ]
+
+    def successor(self, node, j):
+        # Returns the center of node after 2**j generations,
+        # where j is at most node.level - 2.
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        if node.population == 0:
+            result = self.empty(node.level - 1)
+        elif node.level == 2:
+            result = self._step_level2(node)
+        else:
+            result = self._successor_recursive(node, j)
+
+        self.results[key] = result
+        if len(self.results) > self.max_nodes:
+            # Results are only a memo, so unlike nodes they can
+            # be dropped in the middle of a step.
+            self._note_peaks()
+            self.results = {}
+        return result
+
+    def _successor_recursive(self, node, j):
+        join = self.join
+        sub_j = min(j, node.level - 3)
+        c = [self.successor(part, sub_j)
+             for part in self._centered(node)]
+
+        if j < node.level - 2:
+            # Slow step: the nine results already cover the
+            # requested generations, so just re-center them.
+            return join(
+                join(c[0].se, c[1].sw, c[3].ne, c[4].nw),
+                join(c[1].se, c[2].sw, c[4].ne, c[5].nw),
+                join(c[3].se, c[4].sw, c[6].ne, c[7].nw),
+                join(c[4].se, c[5].sw, c[7].ne, c[8].nw))
+
+        # Fast step: advance twice, each half the distance
+        return join(
+            self.successor(join(c[0], c[1], c[3], c[4]), sub_j),
+            self.successor(join(c[1], c[2], c[4], c[5]), sub_j),
+            self.successor(join(c[3], c[4], c[6], c[7]), sub_j),
+            self.successor(join(c[4], c[5], c[7], c[8]), sub_j))
+
+
+# Example 24
+    def _note_peaks(self):
+        self.peak_nodes = max(self.peak_nodes, len(self.nodes))
+        self.peak_results = max(
+            self.peak_results, len(self.results))
+
+    def collect(self, roots):
+        # The node limit is soft: nodes still in use by a step
+        # can't be dropped, so the table may grow past
+        # max_nodes until the step ends and this runs.
+        self._note_peaks()
+        if (len(self.nodes) <= self.max_nodes and
+                len(self.results) <= self.max_nodes):
+            return
+
+        # Drop every memoized result and any node that isn't
+        # reachable from the given roots.
+        self.nodes = {}
+        self.results = {}
+        self.collections += 1
+        for node in list(roots) + self.empty_nodes:
+            self._intern(node)
+
+    def _intern(self, node):
+        if node.level == 0:
+            return
+        key = (node.nw, node.ne, node.sw, node.se)
+        if key in self.nodes:
+            return
+        for child in key:
+            self._intern(child)
+        self.nodes[key] = node
+
+    def stats(self):
+        self._note_peaks()
+        return {
+            'nodes': len(self.nodes),
+            'results': len(self.results),
+            'max_nodes': self.max_nodes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collections': self.collections,
+            'peak_nodes': self.peak_nodes,
+            'peak_results': self.peak_results,
+        }
+
+
+# Example 25
+class HashLifeGrid:
+    def __init__(self, height, width, engine=None):
+        if height != width or height & (height - 1):
+            raise ValueError(
+                'HashLife needs a square, power-of-two board')
+        self.height = height
+        self.width = width
+        self.level = height.bit_length() - 1
+        if engine is None:
+            engine = HashLife()
+        self.engine = engine
+        self.root = engine.empty(self.level)
+        self.generation = 0
+
+    def get(self, y, x):
+        y %= self.height
+        x %= self.width
+        node = self.root
+        while node.level > 0:
+            half = 1 << (node.level - 1)
+            if y < half:
+                node = node.nw if x < half else node.ne
+            else:
+                node = node.sw if x < half else node.se
+            y %= half
+            x %= half
+        return ALIVE if node.population else EMPTY
+
+    def set(self, y, x, state):
+        leaf = self.engine.leaf(state)
+        y %= self.height
+        x %= self.width
+        self.root = self._set(self.root, y, x, leaf)
+
+    def _set(self, node, y, x, leaf):
+        if node.level == 0:
+            return leaf
+        half = 1 << (node.level - 1)
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        if y < half and x < half:
+            nw = self._set(nw, y, x, leaf)
+        elif y < half:
+            ne = self._set(ne, y, x - half, leaf)
+        elif x < half:
+            sw = self._set(sw, y - half, x, leaf)
+        else:
+            se = self._set(se, y - half, x - half, leaf)
+        return self.engine.join(nw, ne, sw, se)
+
+    @classmethod
+    def from_grid(cls, grid, engine=None):
+        result = cls(grid.height, grid.width, engine)
+        result.root = result._build(grid, result.level, 0, 0)
+        return result
+
+    def _build(self, grid, level, y, x):
+        if level == 0:
+            return self.engine.leaf(grid.get(y, x))
+        half = 1 << (level - 1)
+        return self.engine.join(
+            self._build(grid, level - 1, y, x),
+            self._build(grid, level - 1, y, x + half),
+            self._build(grid, level - 1, y + half, x),
+            self._build(grid, level - 1, y + half, x + half))
+
+    def to_grid(self):
+        grid = Grid(self.height, self.width)
+        self._export(grid, self.root, 0, 0)
+        return grid
+
+    def _export(self, grid, node, y, x):
+        if node.population == 0:
+            return
+        if node.level == 0:
+            grid.set(y, x, ALIVE)
+            return
+        half = 1 << (node.level - 1)
+        self._export(grid, node.nw, y, x)
+        self._export(grid, node.ne, y, x + half)
+        self._export(grid, node.sw, y + half, x)
+        self._export(grid, node.se, y + half, x + half)
+
+    def __str__(self):
+        return str(self.to_grid())
+
+
+# Example 26
+    def step(self, k):
+        # The board wraps around, which is the same as an
+        # infinite plane tiled with copies of it. Tile until
+        # the center of the tiling is still aligned with the
+        # board after 2**k generations.
+        engine = self.engine
+        tiled = self.root
+        while tiled.level < max(self.level, k) + 2:
+            tiled = engine.join(tiled, tiled, tiled, tiled)
+
+        result = engine.successor(tiled, k)
+        while result.level > self.level:
+            result = result.nw
+
+        self.root = result
+        self.generation += 1 << k
+        engine.collect([self.root])
+
+    def advance(self, generations):
+        k = 0
+        while generations:
+            if generations & 1:
+                self.step(k)
+            generations >>= 1
+            k += 1
+
+
+# Example 27
+grid = random_grid(Grid, 16, 16)
+hash_grid = HashLifeGrid.from_grid(grid)
+assert str(hash_grid) == str(grid)
+
+for i in range(10):
+    grid = simulate(grid)
+    hash_grid.step(0)
+    assert str(hash_grid) == str(grid), i
+
+for _ in range(8):
+    grid = simulate(grid)
+hash_grid.step(3)
+assert str(hash_grid) == str(grid)
+
+for _ in range(37):
+    grid = simulate(grid)
+hash_grid.advance(37)
+assert str(hash_grid) == str(grid)
+assert hash_grid.generation == 10 + 8 + 37
+
+for size in (1, 2, 4):
+    grid = random_grid(Grid, size, size, density=0.5)
+    hash_grid = HashLifeGrid.from_grid(grid)
+    for i in range(5):
+        grid = simulate(grid)
+        hash_grid.step(0)
+        assert str(hash_grid) == str(grid), (size, i)
+
+try:
+    HashLifeGrid(5, 9)
+except ValueError:
+    pass  # Expected
+else:
+    assert False
+
+
+# Example 28
+def glider_grid(grid_type, height, width, offset=0):
+    grid = grid_type(height, width)
+    grid.set(offset + 0, offset + 1, ALIVE)
+    grid.set(offset + 1, offset + 2, ALIVE)
+    grid.set(offset + 2, offset + 0, ALIVE)
+    grid.set(offset + 2, offset + 1, ALIVE)
+    grid.set(offset + 2, offset + 2, ALIVE)
+    return grid
+
+# A glider moves one cell diagonally every four generations
+engine = HashLife(max_nodes=10_000)
+hash_grid = HashLifeGrid.from_grid(
+    glider_grid(Grid, 64, 64), engine)
+hash_grid.advance(10 ** 6)
+shift = (10 ** 6 // 4) % 64
+assert str(hash_grid) == str(glider_grid(Grid, 64, 64, shift))
+print(engine.stats())
+assert engine.stats()['peak_results'] <= 10_000 + 1
+
+# Memory stays bounded when the cache limit is small
+engine = HashLife(max_nodes=500)
+grid = random_grid(Grid, 32, 32)
+hash_grid = HashLifeGrid.from_grid(grid, engine)
+for _ in range(20):
+    grid = simulate(grid)
+hash_grid.advance(20)
+assert str(hash_grid) == str(grid)
+assert engine.stats()['collections'] > 0
+
+# Results are capped even inside one large step
+engine = HashLife(max_nodes=200)
+grid = random_grid(Grid, 32, 32)
+hash_grid = HashLifeGrid.from_grid(grid, engine)
+for _ in range(64):
+    grid = simulate(grid)
+hash_grid.step(6)
+assert str(hash_grid) == str(grid)
+assert engine.stats()['peak_results'] <= 200 + 1
+assert engine.stats()['peak_nodes'] > 200  # Soft limit
+
+
+# Example 29
+class ChangeTrackingGrid(Grid):
+    def __init__(self, height, width):
+        super().__init__(height, width)
+        self.changed = None  # Unknown, so check every cell
+        self.evaluated = 0
+
+    def set(self, y, x, state):
+        super().set(y, x, state)
+        if self.changed is not None:
+            self.changed.add((y % self.height, x % self.width))
+
+def simulate_incremental(grid, rule=LIFE):
+    height, width = grid.height, grid.width
+    if grid.changed is None:
+        candidates = [
+            (y, x) for y in range(height) for x in range(width)]
+    else:
+        candidates = set(grid.changed)
+        for y, x in grid.changed:
+            for dy, dx in NEIGHBOR_OFFSETS:
+                candidates.add(
+                    ((y + dy) % height, (x + dx) % width))
+
+    next_grid = ChangeTrackingGrid(height, width)
+    next_grid.rows = [list(row) for row in grid.rows]
+
+    changed = set()
+    for y, x in candidates:
+        state = grid.get(y, x)
+        if rule.table[neighborhood(y, x, grid.get)]:
+            next_state = ALIVE
+        else:
+            next_state = EMPTY
+        if next_state != state:
+            next_grid.set(y, x, next_state)
+            changed.add((y, x))
+
+    next_grid.changed = changed
+    next_grid.evaluated = len(candidates)
+    return next_grid
+
+
+# Example 30
+grid = random_grid(Grid, 30, 40)
+tracking_grid = copy_grid(grid, ChangeTrackingGrid)
+
+evaluated = []
+for i in range(100):
+    grid = simulate(grid)
+    tracking_grid = simulate_incremental(tracking_grid)
+    assert str(tracking_grid) == str(grid), i
+    evaluated.append(tracking_grid.evaluated)
+
+total = grid.height * grid.width
+assert evaluated[0] == total
+print(f'Evaluated {evaluated[0]} of {total} cells at first, '
+      f'{evaluated[-1]} of {total} after {len(evaluated)} '
+      f'generations')
+
+# Edits between generations are picked up too
+tracking_grid.set(0, 0, ALIVE)
+tracking_grid.set(0, 1, ALIVE)
+grid.set(0, 0, ALIVE)
+grid.set(0, 1, ALIVE)
+tracking_grid = simulate_incremental(tracking_grid)
+grid = simulate(grid)
+assert str(tracking_grid) == str(grid)
+
+
+# Example 31
+HIGH_LIFE = Rule('B36/S23')
+
+grid = random_grid(Grid, 32, 32)
+array_grid = copy_grid(grid, ArrayGrid)
+bit_grid = copy_grid(grid, BitGrid)
+sparse_grid = SparseGrid.from_grid(grid)
+hash_grid = HashLifeGrid.from_grid(grid, HashLife(rule=HIGH_LIFE))
+tracking_grid = copy_grid(grid, ChangeTrackingGrid)
+
+for i in range(10):
+    grid = simulate_rule(grid, HIGH_LIFE)
+    array_grid = simulate_array(array_grid, HIGH_LIFE)
+    bit_grid = simulate_bits(bit_grid, HIGH_LIFE)
+    sparse_grid = simulate_sparse(sparse_grid, HIGH_LIFE)
+    hash_grid.step(0)
+    tracking_grid = simulate_incremental(
+        tracking_grid, HIGH_LIFE)
+    expected = str(grid)
+    assert str(array_grid) == expected, i
+    assert str(bit_grid) == expected, i
+    assert str(sparse_grid) == expected, i
+    assert str(hash_grid) == expected, i
+    assert str(tracking_grid) == expected, i
+
+
+# Example 32
+grid = random_grid(Grid, 100, 100)
+assert str(simulate_rule(grid)) == str(simulate(grid))
+
+serial_time = timeit.timeit(lambda: simulate(grid), number=3)
+rule_time = timeit.timeit(lambda: simulate_rule(grid), number=3)
+print(f'game_logic: {serial_time / 3 * 1000:.1f}ms, '
+      f'lookup table: {rule_time / 3 * 1000:.1f}ms '
+      f'per generation')
+
+
+# Example 33
+def viewport_lines(grid, viewport=None):
+    if viewport is None:
+        top, left, height, width = 0, 0, grid.height, grid.width
+    else:
+        top, left, height, width = viewport
+    get = grid.get
+    for y in range(top, top + height):
+        yield ''.join(get(y, x) for x in range(left, left + width))
+
+def render(grid, stream, viewport=None):
+    for line in viewport_lines(grid, viewport):
+        stream.write(line)
+        stream.write('\n')
+
+class StreamingColumnPrinter:
+    def __init__(self, viewport=None):
+        self.viewport = viewport
+        self.columns = []
+
+    def append(self, grid):
+        lines = list(viewport_lines(grid, self.viewport))
+        self.columns.append(lines)
+
+    def write(self, stream):
+        headers = []
+        for i, lines in enumerate(self.columns):
+            padding = ' ' * (len(lines[0]) // 2)
+            headers.append(padding + str(i) + padding)
+        stream.write(' | '.join(headers))
+        stream.write('\n')
+
+        for row in zip(*self.columns):
+            stream.write(' | '.join(row))
+            stream.write('\n')
+
+
+# Example 34
+grid = Grid(5, 9)
+grid.set(0, 3, ALIVE)
+grid.set(1, 4, ALIVE)
+grid.set(2, 2, ALIVE)
+grid.set(2, 3, ALIVE)
+grid.set(2, 4, ALIVE)
+
+columns = ColumnPrinter()
+streaming = StreamingColumnPrinter()
+for i in range(5):
+    columns.append(str(grid))
+    streaming.append(grid)
+    grid = simulate(grid)
+
+output = io.StringIO()
+streaming.write(output)
+assert output.getvalue() == str(columns) + '\n'
+
+output = io.StringIO()
+render(grid, output)
+assert output.getvalue() == str(grid)
+
+# The viewport wraps around the edges like Grid.get
+corner_grid = Grid(5, 9)
+corner_grid.set(0, 0, ALIVE)
+output = io.StringIO()
+render(corner_grid, output, viewport=(4, 8, 2, 2))
+assert output.getvalue() == '--\n-*\n'
+
+streaming = StreamingColumnPrinter(viewport=(2, 2, 3, 3))
+streaming.append(grid)
+streaming.write(STDOUT)
+
+
+# Example 35
+grid = random_grid(Grid, 500, 20)
+
+def render_columns(printer_type, value):
+    printer = printer_type()
+    for _ in range(50):
+        printer.append(value)
+    return printer
+
+column_time = timeit.timeit(
+    lambda: str(render_columns(ColumnPrinter, str(grid))),
+    number=1)
+streaming_time = timeit.timeit(
+    lambda: render_columns(
+        StreamingColumnPrinter, grid).write(io.StringIO()),
+    number=1)
+print(f'ColumnPrinter: {column_time * 1000:.1f}ms, '
+      f'streaming: {streaming_time * 1000:.1f}ms')
+
+
+# Example 36
+import itertools
+
+def save_rle(grid, path, rule=LIFE):
+    tokens = []
+    row_ends = 0
+    for y in range(grid.height):
+        line = ''.join(grid.get(y, x) for x in range(grid.width))
+        line = line.rstrip(EMPTY)
+        if line:
+            if row_ends:
+                tokens.append(rle_token(row_ends, '$'))
+                row_ends = 0
+            for state, run in itertools.groupby(line):
+                tag = 'o' if state == ALIVE else 'b'
+                tokens.append(rle_token(len(list(run)), tag))
+        row_ends += 1
+    tokens.append('!')
+
+    with open(path, 'w') as f:
+        f.write(f'x = {grid.width}, y = {grid.height}, '
+                f'rule = {rule.rulestring}\n')
+        line = ''
+        for token in tokens:
+            if len(line) + len(token) > 70:
+                f.write(line + '\n')
+                line = ''
+            line += token
+        f.write(line + '\n')
+
+def rle_token(count, tag):
+    if count == 1:
+        return tag
+    return f'{count}{tag}'
+
+def load_rle(path, grid_type=Grid):
+    header = None
+    body = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if header is None:
+                header = line
+            else:
+                body.append(line)
+
+    if header is None:
+        raise ValueError(f'Missing RLE header: {path!r}')
+    fields = {}
+    for part in header.split(','):
+        key, value = part.split('=')
+        fields[key.strip()] = value.strip()
+    if 'x' not in fields or 'y' not in fields:
+        raise ValueError(f'RLE header needs x and y: {header!r}')
+    grid = grid_type(int(fields['y']), int(fields['x']))
+    rule = Rule(fields.get('rule', 'B3/S23'))
+
+    y = x = 0
+    count = ''
+    for char in ''.join(body):
+        if char.isdigit():
+            count += char
+            continue
+        run = int(count) if count else 1
+        count = ''
+        if char in 'bo' and (x + run > grid.width or
+                             y >= grid.height):
+            # Grid.set would wrap this onto the wrong cells
+            raise ValueError(f'RLE run outside {header!r}')
+        if char == 'b':
+            x += run
+        elif char == 'o':
+            for i in range(run):
+                grid.set(y, x + i, ALIVE)
+            x += run
+        elif char == '$':
+            y += run
+            x = 0
+        elif char == '!':
+            break
+        else:
+            raise ValueError(f'Unknown RLE tag: {char!r}')
+
+    return grid, rule
+
+
+# Example 37
+import mmap
+import struct
+
+# Magic bytes, height, width, then each row in the same
+# padded little-endian bit layout as BitGrid.data.
+PACKED_MAGIC = b'GOL\x01'
+PACKED_HEADER = struct.Struct('<4sII')
+
+def save_packed(grid, path):
+    if not isinstance(grid, BitGrid):
+        grid = copy_grid(grid, BitGrid)
+    with open(path, 'wb') as f:
+        f.write(PACKED_HEADER.pack(
+            PACKED_MAGIC, grid.height, grid.width))
+        f.write(grid.data)
+
+def load_packed(path, viewport=None):
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if len(data) < PACKED_HEADER.size:
+            raise ValueError(f'Not a packed board: {path!r}')
+        magic, height, width = PACKED_HEADER.unpack_from(data)
+        if magic != PACKED_MAGIC:
+            raise ValueError(f'Not a packed board: {path!r}')
+        start = PACKED_HEADER.size
+        row_bytes = (width + 63) // 64 * 8
+        if len(data) < start + height * row_bytes:
+            raise ValueError(f'Truncated packed board: {path!r}')
+
+        if viewport is None:
+            grid = BitGrid(height, width)
+            end = start + len(grid.data)
+            grid.data[:] = data[start:end]
+            return grid
+
+        top, left, view_height, view_width = viewport
+        if view_height > height or view_width > width:
+            raise ValueError('Viewport is larger than the board')
+
+        # Only the rows inside the viewport are read
+        grid = BitGrid(view_height, view_width)
+        left %= width
+        board_mask = (1 << width) - 1
+        view_mask = (1 << view_width) - 1
+        for y in range(view_height):
+            row_start = start + (top + y) % height * row_bytes
+            row_end = row_start + row_bytes
+            bits = int.from_bytes(data[row_start:row_end], 'little')
+            rotated = bits >> left | bits << (width - left)
+            grid.set_row(y, rotated & board_mask & view_mask)
+        return grid
+
+
+# Example 38
+with open('glider.rle', 'w') as f:
+    f.write('#N Glider\n'
+            'x = 3, y = 3, rule = B3/S23\n'
+            'bo$2bo$3o!\n')
+
+grid, rule = load_rle('glider.rle')
+assert str(grid) == str(glider_grid(Grid, 3, 3))
+assert rule.rulestring == 'B3/S23'
+
+grid = random_grid(Grid, 40, 150, density=0.1)
+grid.set(39, 0, ALIVE)
+save_rle(grid, 'random.rle', HIGH_LIFE)
+loaded, rule = load_rle('random.rle', SparseGrid)
+assert str(loaded) == str(grid)
+assert rule.rulestring == HIGH_LIFE.rulestring
+with open('random.rle') as f:
+    assert max(len(line) for line in f) <= 71
+
+save_packed(grid, 'random.life')
+loaded = load_packed('random.life')
+assert str(loaded) == str(grid)
+
+viewport = (35, 140, 10, 20)
+window = load_packed('random.life', viewport)
+output = io.StringIO()
+render(grid, output, viewport)
+assert str(window) == output.getvalue()
+
+# Damaged files raise instead of loading a corrupt board
+with open('random.life', 'rb') as f:
+    data = f.read()
+with open('truncated.life', 'wb') as f:
+    f.write(data[:-1])
+with open('headless.rle', 'w') as f:
+    f.write('#N No header\n')
+with open('wide.rle', 'w') as f:
+    f.write('x = 3, y = 2\n2b2o!\n')
+with open('tall.rle', 'w') as f:
+    f.write('x = 3, y = 2\n3o2$o!\n')
+
+for func, path in ((load_packed, 'truncated.life'),
+                   (load_rle, 'headless.rle'),
+                   (load_rle, 'wide.rle'),
+                   (load_rle, 'tall.rle')):
+    try:
+        func(path)
+    except ValueError:
+        pass  # Expected
+    else:
+        assert False, path
+
+
+# Example 39
+class Fingerprinter:
+    def __init__(self, height, width, seed=1234):
+        self.height = height
+        self.width = width
+        rng = random.Random(seed)
+        self.keys = [
+            [rng.getrandbits(64) for _ in range(width)]
+            for _ in range(height)
+        ]
+
+    def fingerprint(self, grid):
+        result = 0
+        for y in range(self.height):
+            for x in range(self.width):
+                if grid.get(y, x) == ALIVE:
+                    result ^= self.keys[y][x]
+        return result
+
+    def update(self, fingerprint, changed):
+        # Flipping a cell either way toggles its key
+        for y, x in changed:
+            fingerprint ^= self.keys[y][x]
+        return fingerprint
+
+
+# Example 40
+from collections import deque, namedtuple
+
+RunResult = namedtuple(
+    'RunResult', ['grid', 'generation', 'cycle_start', 'period'])
+
+def run_until_cycle(grid, generations, history_size=1000,
+                    fast_forward=False, rule=LIFE):
+    if not isinstance(grid, ChangeTrackingGrid):
+        grid = copy_grid(grid, ChangeTrackingGrid)
+    fingerprinter = Fingerprinter(grid.height, grid.width)
+    fingerprint = fingerprinter.fingerprint(grid)
+
+    history = {fingerprint: 0}
+    order = deque([fingerprint])
+    for generation in range(1, generations + 1):
+        grid = simulate_incremental(grid, rule)
+        fingerprint = fingerprinter.update(
+            fingerprint, grid.changed)
+
+        cycle_start = history.get(fingerprint)
+        if cycle_start is not None:
+            period = generation - cycle_start
+            if fast_forward:
+                # Every remaining full period ends where it began
+                remaining = (generations - generation) % period
+                for _ in range(remaining):
+                    grid = simulate_incremental(grid, rule)
+                generation = generations
+            return RunResult(grid, generation, cycle_start, period)
+
+        history[fingerprint] = generation
+        order.append(fingerprint)
+        if len(order) > history_size:
+            del history[order.popleft()]
+
+    return RunResult(grid, generations, None, None)
+
+
+# Example 41
+blinker = Grid(10, 10)
+blinker.set(4, 3, ALIVE)
+blinker.set(4, 4, ALIVE)
+blinker.set(4, 5, ALIVE)
+result = run_until_cycle(blinker, 1000)
+assert result.generation == 2
+assert (result.cycle_start, result.period) == (0, 2)
+assert str(result.grid) == str(blinker)
+
+result = run_until_cycle(glider_grid(Grid, 8, 8), 1000)
+assert (result.cycle_start, result.period) == (0, 32)
+
+# A short history can only see short cycles
+result = run_until_cycle(glider_grid(Grid, 8, 8), 1000, 10)
+assert result.generation == 1000
+assert result.period is None
+
+grid = random_grid(Grid, 16, 16)
+expected = grid
+for _ in range(1000):
+    expected = simulate_rule(expected)
+
+result = run_until_cycle(grid, 1000, fast_forward=True)
+assert result.generation == 1000
+assert str(result.grid) == str(expected)
+print(f'Cycle of period {result.period} began at '
+      f'generation {result.cycle_start}')
@@ -415,3 +415,153 @@ except SimulationError:
     pass  # Expected
 else:
     assert False
+
+
+# Example 12
+# Restore the working version of this function
+def count_neighbors(y, x, get):
+    n_ = get(y - 1, x + 0)  # North
+    ne = get(y - 1, x + 1)  # Northeast
+    e_ = get(y + 0, x + 1)  # East
+    se = get(y + 1, x + 1)  # Southeast
+    s_ = get(y + 1, x + 0)  # South
+    sw = get(y + 1, x - 1)  # Southwest
+    w_ = get(y + 0, x - 1)  # West
+    nw = get(y - 1, x - 1)  # Northwest
+    neighbor_states = [n_, ne, e_, se, s_, sw, w_, nw]
+    count = 0
+    for state in neighbor_states:
+        if state == ALIVE:
+            count += 1
+    return count
+
+def game_logic_batch_thread(item):
+    y, x_start, states, neighbors = item
+    next_states = []
+    for i, (state, count) in enumerate(zip(states, neighbors)):
+        try:
+            next_state = game_logic(state, count)
+        except Exception as e:
+            return (y, x_start + i, e)
+        next_states.append(next_state)
+    return (y, x_start, ''.join(next_states))
+
+
+# Example 13
+def simulate_batched_pipeline(
+        grid, in_queue, out_queue, batch_size=None):
+    if batch_size is None:
+        batch_size = grid.width     # One row per work item
+
+    for y in range(grid.height):
+        for x_start in range(0, grid.width, batch_size):
+            x_stop = min(x_start + batch_size, grid.width)
+            states = ''.join(
+                grid.get(y, x) for x in range(x_start, x_stop))
+            neighbors = bytes(
+                count_neighbors(y, x, grid.get)
+                for x in range(x_start, x_stop))
+            item = (y, x_start, states, neighbors)
+            in_queue.put(item)                      # Fan out
+
+    in_queue.join()
+    out_queue.close()
+
+    next_grid = Grid(grid.height, grid.width)
+    for item in out_queue:                          # Fan in
+        y, x_start, next_states = item
+        if isinstance(next_states, Exception):
+            raise SimulationError(y, x_start) from next_states
+        x_stop = x_start + len(next_states)
+        next_grid.rows[y][x_start:x_stop] = next_states
+
+    return next_grid
+
+
+# Example 14
+import random
+
+def random_grid(height, width, density=0.3):
+    grid = Grid(height, width)
+    for y in range(height):
+        for x in range(width):
+            if random.random() < density:
+                grid.set(y, x, ALIVE)
+    return grid
+
+def start_workers(func, count, in_queue, out_queue):
+    threads = []
+    for _ in range(count):
+        thread = StoppableWorker(func, in_queue, out_queue)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+def stop_workers(threads, in_queue):
+    for thread in threads:
+        in_queue.close()
+    for thread in threads:
+        thread.join()
+
+cell_in_queue = ClosableQueue()
+cell_out_queue = ClosableQueue()
+cell_threads = start_workers(
+    game_logic_thread, 5, cell_in_queue, cell_out_queue)
+
+batch_in_queue = ClosableQueue()
+batch_out_queue = ClosableQueue()
+batch_threads = start_workers(
+    game_logic_batch_thread, 5, batch_in_queue, batch_out_queue)
+
+grid = random_grid(20, 30)
+for batch_size in (None, 1, 7, 30, 100):
+    cell_grid = grid
+    batch_grid = grid
+    for i in range(3):
+        cell_grid = simulate_pipeline(
+            cell_grid, cell_in_queue, cell_out_queue)
+        batch_grid = simulate_batched_pipeline(
+            batch_grid, batch_in_queue, batch_out_queue,
+            batch_size)
+        assert str(batch_grid) == str(cell_grid), batch_size
+
+
+# Example 15
+import timeit
+
+grid = random_grid(100, 100)
+
+delta = timeit.timeit(
+    lambda: simulate_pipeline(
+        grid, cell_in_queue, cell_out_queue),
+    number=1)
+print(f'Per-cell items: {delta * 1000:.1f}ms')
+
+for batch_size in (10, 100):
+    delta = timeit.timeit(
+        lambda: simulate_batched_pipeline(
+            grid, batch_in_queue, batch_out_queue, batch_size),
+        number=1)
+    print(f'Batches of {batch_size}: {delta * 1000:.1f}ms')
+
+stop_workers(cell_threads, cell_in_queue)
+stop_workers(batch_threads, batch_in_queue)
+
+
+# Example 16
+# Make sure exception propagation works as expected
+def game_logic(state, neighbors):
+    raise OSError('Problem with I/O in game_logic')
+
+in_queue = ClosableQueue()
+out_queue = ClosableQueue()
+thread = StoppableWorker(
+    game_logic_batch_thread, in_queue, out_queue, daemon=True)
+thread.start()
+
+try:
+    simulate_batched_pipeline(Grid(1, 1), in_queue, out_queue)
+except SimulationError:
+    pass  # Expected
+else:
+    assert False
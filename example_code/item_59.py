@@ -205,3 +205,118 @@ except:
     logging.exception('Expected')
 else:
     assert False
+
+
+# Example 5
+# Restore the working version of this function
+def game_logic(state, neighbors):
+    if state == ALIVE:
+        if neighbors < 2:
+            return EMPTY     # Die: Too few
+        elif neighbors > 3:
+            return EMPTY     # Die: Too many
+    else:
+        if neighbors == 3:
+            return ALIVE     # Regenerate
+    return state
+
+def step_band(grid, start, stop):
+    # Reads only from the source grid, which nothing else
+    # modifies, and writes only to rows private to this call.
+    # Index its rows directly so a LockingGrid's lock is
+    # never taken.
+    source = grid.rows
+    height = grid.height
+    width = grid.width
+
+    def get(y, x):
+        return source[y % height][x % width]
+
+    rows = []
+    for y in range(start, stop):
+        row = []
+        for x in range(width):
+            state = get(y, x)
+            neighbors = count_neighbors(y, x, get)
+            row.append(game_logic(state, neighbors))
+        rows.append(row)
+    return rows
+
+def simulate_banded(pool, grid, band_count):
+    band_count = max(1, min(band_count, grid.height))
+    bounds = [grid.height * i // band_count
+              for i in range(band_count + 1)]
+
+    futures = []
+    for start, stop in zip(bounds, bounds[1:]):
+        future = pool.submit(step_band, grid, start, stop)
+        futures.append((start, stop, future))       # Fan out
+
+    next_grid = Grid(grid.height, grid.width)
+    for start, stop, future in futures:
+        next_grid.rows[start:stop] = future.result()  # Fan in
+
+    return next_grid
+
+
+# Example 6
+from threading import Thread
+
+def simulate_threaded(grid):
+    next_grid = LockingGrid(grid.height, grid.width)
+
+    threads = []
+    for y in range(grid.height):
+        for x in range(grid.width):
+            args = (y, x, grid.get, next_grid.set)
+            thread = Thread(target=step_cell, args=args)
+            thread.start()  # Fan out
+            threads.append(thread)
+
+    for thread in threads:
+        thread.join()       # Fan in
+
+    return next_grid
+
+def random_grid(grid_type, height, width, density=0.3):
+    grid = grid_type(height, width)
+    for y in range(height):
+        for x in range(width):
+            if random.random() < density:
+                grid.set(y, x, ALIVE)
+    return grid
+
+grid = random_grid(LockingGrid, 30, 40)
+threaded_grid = grid
+pool_grid = grid
+banded_grid = grid
+
+with ThreadPoolExecutor(max_workers=10) as pool:
+    for i in range(5):
+        threaded_grid = simulate_threaded(threaded_grid)
+        pool_grid = simulate_pool(pool, pool_grid)
+        banded_grid = simulate_banded(pool, banded_grid, 10)
+        assert str(banded_grid) == str(pool_grid), i
+        assert str(banded_grid) == str(threaded_grid), i
+
+
+# Example 7
+import timeit
+
+grid = random_grid(LockingGrid, 50, 50)
+
+# The banded version never needs locks, so give it the same
+# cells in a plain Grid.
+plain_grid = Grid(grid.height, grid.width)
+plain_grid.rows = [row[:] for row in grid.rows]
+
+with ThreadPoolExecutor(max_workers=10) as pool:
+    strategies = [
+        ('simulate_threaded', lambda: simulate_threaded(grid)),
+        ('simulate_pool', lambda: simulate_pool(pool, grid)),
+        ('simulate_banded',
+         lambda: simulate_banded(pool, plain_grid, 10)),
+    ]
+    for name, func in strategies:
+        delta = timeit.timeit(func, number=3) / 3
+        print(f'{name}: {delta * 1000:.1f}ms per generation')
@@ -0,0 +1,68 @@
+#!/usr/bin/env PYTHONHASHSEED=1234 python3
+
+# Copyright 2014-2019 Brett Slatkin, Pearson Education Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from life import ALIVE, Grid, simulate
+from tiles import SharedGrid, simulate_tiled
+
+def random_grid(height, width, density=0.3):
+    grid = Grid(height, width)
+    for y in range(height):
+        for x in range(width):
+            if random.random() < density:
+                grid.set(y, x, ALIVE)
+    return grid
+
+def check_matches_serial():
+    for height, width, workers in [(40, 50, 4),
+                                   (3, 5, 8),
+                                   (1, 1, 2)]:
+        grid = random_grid(height, width)
+        with SharedGrid.from_grid(grid) as shared, \
+                ProcessPoolExecutor(workers) as pool:
+            for i in range(5):
+                grid = simulate(grid)
+                shared = simulate_tiled(pool, shared, workers)
+                assert str(shared) == str(grid), (height, i)
+
+def benchmark(height, width, generations):
+    grid = random_grid(height, width)
+
+    start = time.time()
+    for _ in range(generations):
+        grid = simulate(grid)
+    delta = time.time() - start
+    print(f'Serial: {delta:.3f} seconds')
+
+    for workers in (1, 2, 4):
+        with SharedGrid.from_grid(grid) as shared, \
+                ProcessPoolExecutor(workers) as pool:
+            start = time.time()
+            for _ in range(generations):
+                simulate_tiled(pool, shared, workers)
+            delta = time.time() - start
+        print(f'{workers} workers: {delta:.3f} seconds')
+
+def main():
+    random.seed(1234)
+    check_matches_serial()
+    benchmark(300, 300, 3)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env PYTHONHASHSEED=1234 python3
+
+# Copyright 2014-2019 Brett Slatkin, Pearson Education Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from multiprocessing import shared_memory
+
+from life import EMPTY, Grid, count_neighbors, game_logic
+
+class SharedGrid:
+    def __init__(self, height, width, name=None):
+        self.height = height
+        self.width = width
+        self.generation = 0
+        # Two whole boards, so each generation reads one
+        # buffer and writes the other.
+        size = 2 * height * width
+        if name is None:
+            self.memory = shared_memory.SharedMemory(
+                create=True, size=size)
+            self.memory.buf[:size] = EMPTY.encode() * size
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def _offset(self, y, x):
+        size = self.height * self.width
+        start = (self.generation % 2) * size
+        y %= self.height
+        x %= self.width
+        return start + y * self.width + x
+
+    def row_offset(self, y):
+        return self._offset(y, 0)
+
+    def read_row(self, y):
+        begin = self.row_offset(y)
+        return bytes(self.memory.buf[begin:begin + self.width])
+
+    def write_row(self, y, data):
+        begin = self.row_offset(y)
+        self.memory.buf[begin:begin + self.width] = data
+
+    def get(self, y, x):
+        return chr(self.memory.buf[self._offset(y, x)])
+
+    def set(self, y, x, state):
+        self.memory.buf[self._offset(y, x)] = ord(state)
+
+    def __str__(self):
+        output = []
+        for y in range(self.height):
+            output.append(self.read_row(y))
+            output.append(b'\n')
+        return b''.join(output).decode()
+
+    @classmethod
+    def from_grid(cls, grid):
+        result = cls(grid.height, grid.width)
+        for y in range(grid.height):
+            for x in range(grid.width):
+                result.set(y, x, grid.get(y, x))
+        return result
+
+    def to_grid(self):
+        grid = Grid(self.height, self.width)
+        for y in range(self.height):
+            for x in range(self.width):
+                grid.set(y, x, self.get(y, x))
+        return grid
+
+    def close(self):
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+        self.unlink()
+
+# Each worker process attaches to a board once and then
+# reuses the mapping for every later generation.
+ATTACHED = {}
+
+def attach(name, height, width):
+    if name not in ATTACHED:
+        ATTACHED[name] = SharedGrid(height, width, name)
+    return ATTACHED[name]
+
+def step_tile(name, height, width, generation, start, stop):
+    grid = attach(name, height, width)
+    grid.generation = generation
+
+    # Copy out this tile's rows plus one halo row from each
+    # neighboring tile; nothing else is read.
+    rows = [grid.read_row(y).decode()
+            for y in range(start - 1, stop + 1)]
+
+    def get(y, x):
+        return rows[y][x % width]
+
+    grid.generation = generation + 1
+    for y in range(1, len(rows) - 1):
+        next_row = bytearray(width)
+        for x in range(width):
+            state = rows[y][x]
+            neighbors = count_neighbors(y, x, get)
+            next_row[x] = ord(game_logic(state, neighbors))
+        grid.write_row(start + y - 1, next_row)
+
+def simulate_tiled(pool, grid, tile_count):
+    tile_count = max(1, min(tile_count, grid.height))
+    bounds = [grid.height * i // tile_count
+              for i in range(tile_count + 1)]
+
+    futures = []
+    for start, stop in zip(bounds, bounds[1:]):
+        args = (grid.name, grid.height, grid.width,
+                grid.generation, start, stop)
+        future = pool.submit(step_tile, *args)  # Fan out
+        futures.append(future)
+
+    for future in futures:
+        future.result()                         # Fan in
+
+    grid.generation += 1
+    return grid
@@ -245,3 +245,75 @@ for i in range(5):
 print(columns)
 
 logging.getLogger().setLevel(logging.DEBUG)
+
+
+# Example 7
+async def simulate_bounded(grid, concurrency=100):
+    next_grid = Grid(grid.height, grid.width)
+
+    # Cells are produced lazily in row order, so only the
+    # cells currently being stepped exist at any one time.
+    positions = (
+        (y, x)
+        for y in range(grid.height)
+        for x in range(grid.width)
+    )
+
+    async def worker():
+        for y, x in positions:
+            await step_cell(y, x, grid.get, next_grid.set)
+
+    workers = [worker() for _ in range(concurrency)]  # Fan out
+    await asyncio.gather(*workers)                    # Fan in
+
+    return next_grid
+
+
+# Example 8
+import random
+
+def random_grid(height, width, density=0.3):
+    grid = Grid(height, width)
+    for y in range(height):
+        for x in range(width):
+            if random.random() < density:
+                grid.set(y, x, ALIVE)
+    return grid
+
+logging.getLogger().setLevel(logging.ERROR)
+
+grid = random_grid(20, 30)
+expected = grid
+bounded = grid
+for i in range(5):
+    expected = asyncio.run(simulate(expected))
+    bounded = asyncio.run(simulate_bounded(bounded, 10))
+    assert str(bounded) == str(expected), i
+
+# More workers than cells
+bounded = asyncio.run(simulate_bounded(Grid(1, 1), 10))
+assert str(bounded) == '-\n'
+
+logging.getLogger().setLevel(logging.DEBUG)
+
+
+# Example 9
+import tracemalloc
+
+def peak_memory(coro):
+    tracemalloc.start()
+    asyncio.run(coro)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+logging.getLogger().setLevel(logging.ERROR)
+
+grid = random_grid(100, 100)
+gather_peak = peak_memory(simulate(grid))
+bounded_peak = peak_memory(simulate_bounded(grid, 100))
+print(f'gather: {gather_peak / 1024:.0f} KiB peak, '
+      f'bounded: {bounded_peak / 1024:.0f} KiB peak')
+assert bounded_peak < gather_peak
+
+logging.getLogger().setLevel(logging.DEBUG)
@@ -0,0 +1,146 @@
+#!/usr/bin/env PYTHONHASHSEED=1234 python3
+
+# Copyright 2014-2019 Brett Slatkin, Pearson Education Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows
+
+import strategies
+
+def random_grid(height, width, density, seed):
+    rng = random.Random(seed)
+    grid = strategies.Grid(height, width)
+    for y in range(height):
+        for x in range(width):
+            if rng.random() < density:
+                grid.set(y, x, strategies.ALIVE)
+    return grid
+
+def percentile(sorted_values, fraction):
+    index = round(fraction * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+def peak_rss_bytes(who=None):
+    if resource is None:
+        return None
+    if who is None:
+        who = resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak           # Already in bytes on macOS
+    return peak * 1024
+
+def run_case(name, size, density, workers, latency,
+             generations, seed):
+    # Runs in a fresh child process so the peak RSS
+    # belongs to this case alone.
+    initial = random_grid(size, size, density, seed)
+
+    strategies.set_latency(latency)
+    timings = []
+    grid = initial
+    with strategies.STRATEGIES[name](workers) as step:
+        for _ in range(generations):
+            start = time.perf_counter()
+            grid = step(grid)
+            timings.append(time.perf_counter() - start)
+
+    # Measure before the serial reference run below
+    peak_rss = peak_rss_bytes()
+    # Only set for strategies that start worker processes
+    peak_child_rss = peak_rss_bytes(resource.RUSAGE_CHILDREN
+                                    if resource else None)
+
+    strategies.set_latency(0)
+    expected = initial
+    for _ in range(generations):
+        expected = strategies.simulate(expected)
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        'strategy': name,
+        'size': size,
+        'density': density,
+        'workers': workers,
+        'latency': latency,
+        'generations': generations,
+        'matches_serial': str(grid) == str(expected),
+        'cells_per_second': size * size * generations / total,
+        'p50_generation_seconds': percentile(timings, 0.5),
+        'p99_generation_seconds': percentile(timings, 0.99),
+        'peak_rss_bytes': peak_rss,
+        'peak_child_rss_bytes': peak_child_rss,
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark every Game of Life strategy')
+    parser.add_argument(
+        '--strategies', nargs='+',
+        default=list(strategies.STRATEGIES),
+        choices=list(strategies.STRATEGIES))
+    parser.add_argument(
+        '--sizes', nargs='+', type=int, default=[16, 32])
+    parser.add_argument(
+        '--densities', nargs='+', type=float,
+        default=[0.1, 0.5])
+    parser.add_argument(
+        '--workers', nargs='+', type=int, default=[1, 4])
+    parser.add_argument(
+        '--latencies', nargs='+', type=float,
+        default=[0, 0.0001],
+        help='Seconds of simulated I/O per game_logic call')
+    parser.add_argument('--generations', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument(
+        '--output', help='Write JSON here instead of stdout')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    results = []
+    for name in args.strategies:
+        for size in args.sizes:
+            for density in args.densities:
+                for workers in args.workers:
+                    for latency in args.latencies:
+                        case = (name, size, density, workers,
+                                latency, args.generations,
+                                args.seed)
+                        with ProcessPoolExecutor(1) as executor:
+                            future = executor.submit(
+                                run_case, *case)
+                            results.append(future.result())
+
+    data = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    else:
+        print(data)
+
+if __name__ == '__main__':
+    main()
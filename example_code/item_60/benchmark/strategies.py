@@ -0,0 +1,574 @@
+#!/usr/bin/env PYTHONHASHSEED=1234 python3
+
+# Copyright 2014-2019 Brett Slatkin, Pearson Education Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import contextlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from queue import Queue
+from threading import Lock, Thread
+
+ALIVE = '*'
+EMPTY = '-'
+
+# Seconds of simulated I/O in every game_logic call
+LATENCY = 0
+
+def set_latency(seconds):
+    global LATENCY
+    LATENCY = seconds
+
+class SimulationError(Exception):
+    pass
+
+class Grid:
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.rows = []
+        for _ in range(self.height):
+            self.rows.append([EMPTY] * self.width)
+
+    def get(self, y, x):
+        return self.rows[y % self.height][x % self.width]
+
+    def set(self, y, x, state):
+        self.rows[y % self.height][x % self.width] = state
+
+    def __str__(self):
+        output = ''
+        for row in self.rows:
+            for cell in row:
+                output += cell
+            output += '\n'
+        return output
+
+class LockingGrid(Grid):
+    def __init__(self, height, width):
+        super().__init__(height, width)
+        self.lock = Lock()
+
+    def __str__(self):
+        with self.lock:
+            return super().__str__()
+
+    def get(self, y, x):
+        with self.lock:
+            return super().get(y, x)
+
+    def set(self, y, x, state):
+        with self.lock:
+            return super().set(y, x, state)
+
+def count_neighbors(y, x, get):
+    n_ = get(y - 1, x + 0)  # North
+    ne = get(y - 1, x + 1)  # Northeast
+    e_ = get(y + 0, x + 1)  # East
+    se = get(y + 1, x + 1)  # Southeast
+    s_ = get(y + 1, x + 0)  # South
+    sw = get(y + 1, x - 1)  # Southwest
+    w_ = get(y + 0, x - 1)  # West
+    nw = get(y - 1, x - 1)  # Northwest
+    neighbor_states = [n_, ne, e_, se, s_, sw, w_, nw]
+    count = 0
+    for state in neighbor_states:
+        if state == ALIVE:
+            count += 1
+    return count
+
+def next_state(state, neighbors):
+    if state == ALIVE:
+        if neighbors < 2:
+            return EMPTY     # Die: Too few
+        elif neighbors > 3:
+            return EMPTY     # Die: Too many
+    else:
+        if neighbors == 3:
+            return ALIVE     # Regenerate
+    return state
+
+def game_logic(state, neighbors):
+    if LATENCY:
+        time.sleep(LATENCY)  # Blocking I/O
+    return next_state(state, neighbors)
+
+async def game_logic_async(state, neighbors):
+    if LATENCY:
+        await asyncio.sleep(LATENCY)  # Non-blocking I/O
+    return next_state(state, neighbors)
+
+def step_cell(y, x, get, set):
+    state = get(y, x)
+    neighbors = count_neighbors(y, x, get)
+    next_state = game_logic(state, neighbors)
+    set(y, x, next_state)
+
+# Item 56
+def simulate(grid):
+    next_grid = Grid(grid.height, grid.width)
+    for y in range(grid.height):
+        for x in range(grid.width):
+            step_cell(y, x, grid.get, next_grid.set)
+    return next_grid
+
+# Item 57
+def simulate_threaded(grid):
+    next_grid = LockingGrid(grid.height, grid.width)
+
+    threads = []
+    for y in range(grid.height):
+        for x in range(grid.width):
+            args = (y, x, grid.get, next_grid.set)
+            thread = Thread(target=step_cell, args=args)
+            thread.start()  # Fan out
+            threads.append(thread)
+
+    for thread in threads:
+        thread.join()       # Fan in
+
+    return next_grid
+
+# Item 58
+class ClosableQueue(Queue):
+    SENTINEL = object()
+
+    def close(self):
+        self.put(self.SENTINEL)
+
+    def __iter__(self):
+        while True:
+            item = self.get()
+            try:
+                if item is self.SENTINEL:
+                    return  # Cause the thread to exit
+                yield item
+            finally:
+                self.task_done()
+
+class StoppableWorker(Thread):
+    def __init__(self, func, in_queue, out_queue, **kwargs):
+        super().__init__(**kwargs)
+        self.func = func
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+
+    def run(self):
+        for item in self.in_queue:
+            result = self.func(item)
+            self.out_queue.put(result)
+
+def count_neighbors_thread(item):
+    y, x, state, get = item
+    try:
+        neighbors = count_neighbors(y, x, get)
+    except Exception as e:
+        neighbors = e
+    return (y, x, state, neighbors)
+
+def game_logic_thread(item):
+    y, x, state, neighbors = item
+    if isinstance(neighbors, Exception):
+        next_state = neighbors
+    else:
+        try:
+            next_state = game_logic(state, neighbors)
+        except Exception as e:
+            next_state = e
+    return (y, x, next_state)
+
+def game_logic_batch_thread(item):
+    y, x_start, states, neighbors = item
+    next_states = []
+    for i, (state, count) in enumerate(zip(states, neighbors)):
+        try:
+            next_state = game_logic(state, count)
+        except Exception as e:
+            return (y, x_start + i, e)
+        next_states.append(next_state)
+    return (y, x_start, ''.join(next_states))
+
+def simulate_pipeline(grid, in_queue, out_queue):
+    for y in range(grid.height):
+        for x in range(grid.width):
+            state = grid.get(y, x)
+            neighbors = count_neighbors(y, x, grid.get)
+            in_queue.put((y, x, state, neighbors))  # Fan out
+
+    in_queue.join()
+    out_queue.close()
+
+    next_grid = Grid(grid.height, grid.width)
+    for item in out_queue:                          # Fan in
+        y, x, next_state = item
+        if isinstance(next_state, Exception):
+            raise SimulationError(y, x) from next_state
+        next_grid.set(y, x, next_state)
+
+    return next_grid
+
+def simulate_phased_pipeline(
+        grid, in_queue, logic_queue, out_queue):
+    for y in range(grid.height):
+        for x in range(grid.width):
+            state = grid.get(y, x)
+            item = (y, x, state, grid.get)
+            in_queue.put(item)          # Fan out
+
+    in_queue.join()
+    logic_queue.join()                  # Pipeline sequencing
+    out_queue.close()
+
+    next_grid = LockingGrid(grid.height, grid.width)
+    for item in out_queue:              # Fan in
+        y, x, next_state = item
+        if isinstance(next_state, Exception):
+            raise SimulationError(y, x) from next_state
+        next_grid.set(y, x, next_state)
+
+    return next_grid
+
+def simulate_batched_pipeline(
+        grid, in_queue, out_queue, batch_size=None):
+    if batch_size is None:
+        batch_size = grid.width     # One row per work item
+
+    for y in range(grid.height):
+        for x_start in range(0, grid.width, batch_size):
+            x_stop = min(x_start + batch_size, grid.width)
+            states = ''.join(
+                grid.get(y, x) for x in range(x_start, x_stop))
+            neighbors = bytes(
+                count_neighbors(y, x, grid.get)
+                for x in range(x_start, x_stop))
+            item = (y, x_start, states, neighbors)
+            in_queue.put(item)                      # Fan out
+
+    in_queue.join()
+    out_queue.close()
+
+    next_grid = Grid(grid.height, grid.width)
+    for item in out_queue:                          # Fan in
+        y, x_start, next_states = item
+        if isinstance(next_states, Exception):
+            raise SimulationError(y, x_start) from next_states
+        x_stop = x_start + len(next_states)
+        next_grid.rows[y][x_start:x_stop] = next_states
+
+    return next_grid
+
+# Item 59
+def simulate_pool(pool, grid):
+    next_grid = LockingGrid(grid.height, grid.width)
+
+    futures = []
+    for y in range(grid.height):
+        for x in range(grid.width):
+            args = (y, x, grid.get, next_grid.set)
+            future = pool.submit(step_cell, *args)  # Fan out
+            futures.append(future)
+
+    for future in futures:
+        future.result()                             # Fan in
+
+    return next_grid
+
+def step_band(grid, start, stop):
+    # Read the rows directly so a LockingGrid never locks
+    source = grid.rows
+    height = grid.height
+    width = grid.width
+
+    def get(y, x):
+        return source[y % height][x % width]
+
+    rows = []
+    for y in range(start, stop):
+        row = []
+        for x in range(width):
+            state = get(y, x)
+            neighbors = count_neighbors(y, x, get)
+            row.append(game_logic(state, neighbors))
+        rows.append(row)
+    return rows
+
+def simulate_banded(pool, grid, band_count):
+    band_count = max(1, min(band_count, grid.height))
+    bounds = [grid.height * i // band_count
+              for i in range(band_count + 1)]
+
+    futures = []
+    for start, stop in zip(bounds, bounds[1:]):
+        future = pool.submit(step_band, grid, start, stop)
+        futures.append((start, stop, future))       # Fan out
+
+    next_grid = Grid(grid.height, grid.width)
+    for start, stop, future in futures:
+        next_grid.rows[start:stop] = future.result()  # Fan in
+
+    return next_grid
+
+class SharedGrid:
+    # Two boards in shared memory; each generation reads one
+    # and writes the other.
+    def __init__(self, height, width, name=None):
+        self.height = height
+        self.width = width
+        self.generation = 0
+        size = 2 * height * width
+        if name is None:
+            self.memory = shared_memory.SharedMemory(
+                create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def row_offset(self, y):
+        start = (self.generation % 2) * self.height * self.width
+        return start + (y % self.height) * self.width
+
+    def read_row(self, y):
+        begin = self.row_offset(y)
+        return bytes(self.memory.buf[begin:begin + self.width])
+
+    def write_row(self, y, data):
+        begin = self.row_offset(y)
+        self.memory.buf[begin:begin + self.width] = data
+
+    def load(self, grid):
+        for y in range(self.height):
+            self.write_row(y, ''.join(grid.rows[y]).encode())
+
+    def to_grid(self):
+        grid = Grid(self.height, self.width)
+        for y in range(self.height):
+            grid.rows[y] = list(self.read_row(y).decode())
+        return grid
+
+    def close(self):
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
+
+# Each worker process attaches to a board once
+ATTACHED = {}
+
+def step_tile(name, height, width, generation, start, stop):
+    if name not in ATTACHED:
+        ATTACHED[name] = SharedGrid(height, width, name)
+    grid = ATTACHED[name]
+    grid.generation = generation
+
+    # This tile's rows plus one halo row on each side
+    rows = [grid.read_row(y).decode()
+            for y in range(start - 1, stop + 1)]
+
+    def get(y, x):
+        return rows[y][x % width]
+
+    grid.generation = generation + 1
+    for y in range(1, len(rows) - 1):
+        next_row = bytearray(width)
+        for x in range(width):
+            neighbors = count_neighbors(y, x, get)
+            next_row[x] = ord(game_logic(rows[y][x], neighbors))
+        grid.write_row(start + y - 1, next_row)
+
+def simulate_tiled(pool, grid, tile_count):
+    tile_count = max(1, min(tile_count, grid.height))
+    bounds = [grid.height * i // tile_count
+              for i in range(tile_count + 1)]
+
+    futures = []
+    for start, stop in zip(bounds, bounds[1:]):
+        args = (grid.name, grid.height, grid.width,
+                grid.generation, start, stop)
+        future = pool.submit(step_tile, *args)  # Fan out
+        futures.append(future)
+
+    for future in futures:
+        future.result()                         # Fan in
+
+    grid.generation += 1
+    return grid
+
+# Item 60
+async def step_cell_async(y, x, get, set):
+    state = get(y, x)
+    neighbors = count_neighbors(y, x, get)
+    next_state = await game_logic_async(state, neighbors)
+    set(y, x, next_state)
+
+async def simulate_async(grid):
+    next_grid = Grid(grid.height, grid.width)
+
+    tasks = []
+    for y in range(grid.height):
+        for x in range(grid.width):
+            task = step_cell_async(
+                y, x, grid.get, next_grid.set)      # Fan out
+            tasks.append(task)
+
+    await asyncio.gather(*tasks)                    # Fan in
+
+    return next_grid
+
+async def simulate_bounded(grid, concurrency=100):
+    next_grid = Grid(grid.height, grid.width)
+
+    positions = (
+        (y, x)
+        for y in range(grid.height)
+        for x in range(grid.width)
+    )
+
+    async def worker():
+        for y, x in positions:
+            await step_cell_async(y, x, grid.get, next_grid.set)
+
+    workers = [worker() for _ in range(concurrency)]  # Fan out
+    await asyncio.gather(*workers)                    # Fan in
+
+    return next_grid
+
+# Each strategy sets up whatever it needs for a worker
+# count and yields a function that steps one generation.
+@contextlib.contextmanager
+def serial(workers):
+    yield simulate
+
+@contextlib.contextmanager
+def threaded(workers):
+    yield simulate_threaded  # One thread per cell
+
+def start_workers(func, count, in_queue, out_queue):
+    threads = []
+    for _ in range(count):
+        thread = StoppableWorker(func, in_queue, out_queue)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+def stop_workers(threads, in_queue):
+    for thread in threads:
+        in_queue.close()
+    for thread in threads:
+        thread.join()
+
+@contextlib.contextmanager
+def pipeline(workers):
+    in_queue = ClosableQueue()
+    out_queue = ClosableQueue()
+    threads = start_workers(
+        game_logic_thread, workers, in_queue, out_queue)
+    try:
+        yield lambda grid: simulate_pipeline(
+            grid, in_queue, out_queue)
+    finally:
+        stop_workers(threads, in_queue)
+
+@contextlib.contextmanager
+def phased_pipeline(workers):
+    in_queue = ClosableQueue()
+    logic_queue = ClosableQueue()
+    out_queue = ClosableQueue()
+    count_threads = start_workers(
+        count_neighbors_thread, workers, in_queue, logic_queue)
+    logic_threads = start_workers(
+        game_logic_thread, workers, logic_queue, out_queue)
+    try:
+        yield lambda grid: simulate_phased_pipeline(
+            grid, in_queue, logic_queue, out_queue)
+    finally:
+        stop_workers(count_threads, in_queue)
+        stop_workers(logic_threads, logic_queue)
+
+@contextlib.contextmanager
+def batched_pipeline(workers):
+    in_queue = ClosableQueue()
+    out_queue = ClosableQueue()
+    threads = start_workers(
+        game_logic_batch_thread, workers, in_queue, out_queue)
+    try:
+        yield lambda grid: simulate_batched_pipeline(
+            grid, in_queue, out_queue)
+    finally:
+        stop_workers(threads, in_queue)
+
+@contextlib.contextmanager
+def pool(workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield lambda grid: simulate_pool(executor, grid)
+
+@contextlib.contextmanager
+def banded(workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield lambda grid: simulate_banded(
+            executor, grid, workers)
+
+@contextlib.contextmanager
+def tiled(workers):
+    # Workers are processes, so pass along the latency setting
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=set_latency,
+        initargs=(LATENCY,))
+    boards = {}  # One shared board per size, reused
+
+    def step(grid):
+        # Includes copying the board in and out of shared
+        # memory, since every strategy steps a Grid.
+        key = (grid.height, grid.width)
+        if key not in boards:
+            boards[key] = SharedGrid(grid.height, grid.width)
+        shared = boards[key]
+        shared.load(grid)
+        simulate_tiled(executor, shared, workers)
+        return shared.to_grid()
+
+    with executor:
+        try:
+            yield step
+        finally:
+            for shared in boards.values():
+                shared.close()
+                shared.unlink()
+
+@contextlib.contextmanager
+def async_gather(workers):
+    yield lambda grid: asyncio.run(simulate_async(grid))
+
+@contextlib.contextmanager
+def async_bounded(workers):
+    yield lambda grid: asyncio.run(
+        simulate_bounded(grid, workers))
+
+STRATEGIES = {
+    'serial': serial,                    # Item 56
+    'threaded': threaded,                # Item 57
+    'pipeline': pipeline,                # Item 58
+    'phased_pipeline': phased_pipeline,  # Item 58
+    'batched_pipeline': batched_pipeline,
+    'pool': pool,                        # Item 59
+    'banded': banded,
+    'tiled': tiled,
+    'async_gather': async_gather,        # Item 60
+    'async_bounded': async_bounded,
+}
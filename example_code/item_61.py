@@ -452,3 +452,1082 @@ logging.getLogger().setLevel(logging.ERROR)
 asyncio.run(main_async())
 
 logging.getLogger().setLevel(logging.DEBUG)
+
+
+# Example 27
+class IdleTimeoutSession(AsyncSession):
+    def __init__(self, *args, idle_timeout=None):
+        super().__init__(*args)
+        self.idle_timeout = idle_timeout
+        self.timed_out = False
+
+    async def receive(self):
+        if self.idle_timeout is None:
+            return await super().receive()
+
+        # A timer is much cheaper than the extra task that
+        # asyncio.wait_for creates for every command.
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(self.idle_timeout, self.expire)
+        try:
+            return await super().receive()
+        finally:
+            timer.cancel()
+
+    def expire(self):
+        # Closing makes the pending receive raise EOFError
+        self.timed_out = True
+        self.writer.close()
+
+class AsyncGameServer:
+    session_class = IdleTimeoutSession
+
+    def __init__(self, address, max_connections=1000,
+                 idle_timeout=60):
+        self.address = address
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.active = {}  # Session tasks to their writers
+        self.accepted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.errors = 0
+
+    async def start(self):
+        backlog = min(self.max_connections, socket.SOMAXCONN)
+        self.server = await asyncio.start_server(
+            self.handle_connection, *self.address,
+            backlog=backlog)
+
+    async def handle_connection(self, reader, writer):
+        if len(self.active) >= self.max_connections:
+            self.rejected += 1
+            writer.close()
+            return
+
+        self.accepted += 1
+        task = asyncio.current_task()
+        self.active[task] = writer
+        session = self.session_class(
+            reader, writer, idle_timeout=self.idle_timeout)
+        try:
+            await session.loop()
+        except (EOFError, ConnectionError):
+            pass
+        except Exception:
+            # A bad client shouldn't take down the server
+            self.errors += 1
+            logging.exception('Session failed')
+        finally:
+            del self.active[task]
+            writer.close()
+            if session.timed_out:
+                self.timed_out += 1
+
+
+# Example 28
+    async def shutdown(self, drain_timeout=10):
+        # Stop accepting, then give open sessions a chance
+        # to finish before closing whatever is left.
+        self.server.close()
+        if self.active:
+            _, pending = await asyncio.wait(
+                self.active, timeout=drain_timeout)
+            for task in pending:
+                self.active[task].close()
+            if pending:
+                await asyncio.wait(pending)
+        await self.server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.shutdown()
+
+
+# Example 29
+import struct
+
+async def open_session(address, lower, upper):
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(f'PARAMS {lower} {upper}\n'.encode())
+    await writer.drain()
+    return reader, writer
+
+async def request_number(reader, writer):
+    writer.write(b'NUMBER\n')
+    await writer.drain()
+    return await reader.readline()
+
+async def check_server_limits():
+    address = ('127.0.0.1', 4322)
+
+    # Connections past the cap are closed right away
+    server = AsyncGameServer(address, max_connections=2)
+    async with server:
+        first = await open_session(address, 1, 5)
+        second = await open_session(address, 1, 5)
+        assert await request_number(*first)
+        assert await request_number(*second)
+        reader, writer = await asyncio.open_connection(*address)
+        assert await reader.readline() == b''
+        assert server.rejected == 1
+        writer.close()
+        for _, writer in (first, second):
+            writer.close()
+
+    # Bad commands and resets close only their own session
+    server = AsyncGameServer(address)
+    async with server:
+        reader, writer = await asyncio.open_connection(*address)
+        writer.write(b'BOGUS\n')
+        assert await reader.readline() == b''
+        writer.close()
+
+        reader, writer = await open_session(address, 1, 5)
+        await asyncio.sleep(0.1)
+        sock = writer.get_extra_info('socket')
+        # A zero linger time makes close send an RST
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                        struct.pack('ii', 1, 0))
+        writer.close()
+
+        reader, writer = await open_session(address, 1, 5)
+        assert await request_number(reader, writer)
+        writer.close()
+        await asyncio.sleep(0.1)
+        assert server.errors == 1
+
+    # Idle connections are closed after the timeout
+    server = AsyncGameServer(address, idle_timeout=0.1)
+    async with server:
+        reader, writer = await open_session(address, 1, 5)
+        await asyncio.sleep(0.3)
+        assert await reader.readline() == b''
+        assert server.timed_out == 1
+        writer.close()
+
+    # Shutdown lets open sessions finish during the drain
+    server = AsyncGameServer(address)
+    await server.start()
+    reader, writer = await open_session(address, 1, 5)
+    shutdown = asyncio.create_task(
+        server.shutdown(drain_timeout=1))
+    await asyncio.sleep(0.1)
+    try:
+        await asyncio.open_connection(*address)
+    except OSError:
+        pass  # Expected
+    else:
+        assert False
+    assert await request_number(reader, writer)
+    writer.close()
+    await shutdown
+
+    # Sessions that don't finish in time are cancelled
+    server = AsyncGameServer(address)
+    await server.start()
+    reader, writer = await open_session(address, 1, 5)
+    await asyncio.sleep(0.1)
+    await server.shutdown(drain_timeout=0.1)
+    assert await reader.readline() == b''
+    writer.close()
+
+# Hide the expected traceback for the bad command
+logging.getLogger().setLevel(logging.CRITICAL)
+asyncio.run(check_server_limits())
+logging.getLogger().setLevel(logging.DEBUG)
+
+
+# Example 30
+import io
+import time
+
+async def play_session(address, commands):
+    reader, writer = await open_session(address, 1, 10 ** 6)
+    for _ in range(commands):
+        assert await request_number(reader, writer)
+        writer.write(b'REPORT Unsure\n')
+    writer.close()
+    await writer.wait_closed()
+
+async def measure(address, clients, commands):
+    start = time.perf_counter()
+    sessions = [play_session(address, commands)
+                for _ in range(clients)]
+    await asyncio.gather(*sessions)
+    return time.perf_counter() - start
+
+async def compare_servers():
+    threaded_address = ('127.0.0.1', 1234)  # From Example 13
+    async_address = ('127.0.0.1', 4323)
+
+    async with AsyncGameServer(async_address):
+        for name, address in (('threaded', threaded_address),
+                              ('async', async_address)):
+            delta = await measure(address, 200, 1)
+            print(f'{name} server: {200 / delta:.0f} '
+                  f'connections/second')
+            delta = await measure(address, 20, 100)
+            print(f'{name} server: {20 * 100 / delta:.0f} '
+                  f'commands/second')
+
+# Hide the report printing from both servers
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    asyncio.run(compare_servers())
+for line in output.getvalue().splitlines():
+    if not line.startswith('Server:'):
+        print(line)
+
+
+# Example 31
+from collections import deque
+
+class PipelinedSession(IdleTimeoutSession):
+    def _clear_values(self, lower, upper):
+        super()._clear_values(lower, upper)
+        # Guesses sent but not yet reported on, oldest first
+        self.unreported = deque()
+
+    async def send_number(self):
+        guess = self.next_guess()
+        self.guesses.append(guess)
+        self.unreported.append(guess)
+        await self.send(format(guess))
+
+    def receive_report(self, parts):
+        assert len(parts) == 2
+        decision = parts[1]
+
+        last = self.unreported.popleft()
+        if decision == CORRECT:
+            self.secret = last
+            # Guesses already in flight will never be reported
+            self.unreported.clear()
+
+        print(f'Server: {last} is {decision}')
+
+class PipelinedGameServer(AsyncGameServer):
+    session_class = PipelinedSession
+
+
+# Example 32
+class PipelinedClient(AsyncClient):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.unread = 0  # Replies sent but not yet received
+
+    async def skip_unread(self):
+        # Left over when a caller stopped iterating early
+        while self.unread:
+            await self.receive()
+            self.unread -= 1
+
+    async def request_numbers(self, count):
+        await self.skip_unread()
+        if count <= 0:
+            return
+        self.writer.write(b'NUMBER\n' * count)
+        await self.writer.drain()
+        self.unread += count
+
+        while self.unread:
+            data = await self.receive()
+            self.unread -= 1
+            yield int(data)
+            if self.last_distance == 0:
+                return
+
+
+# Example 33
+async def check_pipelined_outcomes():
+    address = ('127.0.0.1', 4324)
+    async with PipelinedGameServer(address):
+        streams = await asyncio.open_connection(*address)
+        client = PipelinedClient(*streams)
+
+        async with client.session(1, 5, 3):
+            results = [(x, await client.report_outcome(x))
+                       async for x in client.request_numbers(5)]
+
+        async with client.session(10, 15, 12):
+            async for number in client.request_numbers(5):
+                outcome = await client.report_outcome(number)
+                results.append((number, outcome))
+
+        # Report after every request has been answered
+        async with client.session(1, 100, 50):
+            numbers = [x async for x in client.request_numbers(5)]
+            for number in numbers:
+                outcome = await client.report_outcome(number)
+                results.append((number, outcome))
+
+        _, writer = streams
+        writer.close()
+        await writer.wait_closed()
+
+    return results
+
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    results = asyncio.run(check_pipelined_outcomes())
+
+server_reports = [
+    line for line in output.getvalue().splitlines()
+    if line.startswith('Server:')
+]
+client_reports = [
+    f'Server: {number} is {outcome}'
+    for number, outcome in results
+]
+assert server_reports == client_reports
+assert results[-1][1] != CORRECT
+assert (3, CORRECT) in results
+assert (12, CORRECT) in results
+
+async def check_early_exit():
+    address = ('127.0.0.1', 4324)
+    async with PipelinedGameServer(address):
+        streams = await asyncio.open_connection(*address)
+        client = PipelinedClient(*streams)
+
+        async with client.session(1, 5, 3):
+            async for number in client.request_numbers(5):
+                await client.report_outcome(number)
+                break  # Leaves four replies unread
+
+        async with client.session(100, 105, 102):
+            found = [x async for x in client.request_numbers(3)]
+
+        _, writer = streams
+        writer.close()
+        await writer.wait_closed()
+
+    return found
+
+with contextlib.redirect_stdout(output):
+    found = asyncio.run(check_early_exit())
+assert all(100 <= x <= 105 for x in found), found
+
+
+# Example 34
+async def time_requests(client_type, address, count):
+    streams = await asyncio.open_connection(*address)
+    client = client_type(*streams)
+    async with client.session(1, 10 ** 6, 0):
+        start = time.perf_counter()
+        numbers = [x async for x in client.request_numbers(count)]
+        delta = time.perf_counter() - start
+        for number in numbers:
+            await client.send('REPORT Unsure')
+
+    _, writer = streams
+    writer.close()
+    await writer.wait_closed()
+    return delta
+
+async def serve_forever(server):
+    async with server:
+        await server.server.serve_forever()
+
+async def compare_clients(address):
+    # Wait for the server to listen before trying to connect
+    await asyncio.sleep(0.1)
+
+    for client_type in (AsyncClient, PipelinedClient):
+        delta = await time_requests(client_type, address, 500)
+        print(f'{client_type.__name__}: {delta * 1000:.1f}ms '
+              f'for 500 requests')
+
+# Serve from another thread so every request makes a real
+# round trip instead of sharing the client's event loop.
+address = ('127.0.0.1', 4325)
+server = PipelinedGameServer(address)
+server_thread = Thread(
+    target=asyncio.run, args=(serve_forever(server),),
+    daemon=True)
+server_thread.start()
+
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    asyncio.run(compare_clients(address))
+for line in output.getvalue().splitlines():
+    if not line.startswith(('Server:', 'Guess')):
+        print(line)
+
+
+# Example 35
+import struct
+
+# Frames are a 2-byte payload length and a 1-byte opcode,
+# followed by fixed-width big-endian integer fields.
+FRAME_HEADER = struct.Struct('>HB')
+PARAMS_FIELDS = struct.Struct('>qq')
+NUMBER_FIELD = struct.Struct('>q')
+DECISION_FIELD = struct.Struct('>B')
+
+OP_PARAMS = 1
+OP_NUMBER = 2
+OP_REPORT = 3
+OP_ANSWER = 4
+
+DECISIONS = [WARMER, COLDER, UNSURE, CORRECT]
+DECISION_CODES = {
+    decision: code for code, decision in enumerate(DECISIONS)}
+
+MAX_PAYLOAD = PARAMS_FIELDS.size
+
+class BinaryConnectionBase(ConnectionBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.binary = False
+        self.buffer = bytearray(64 * 1024)
+        self.view = memoryview(self.buffer)
+        self.start = 0  # First byte not yet returned
+        self.end = 0    # One past the last byte received
+
+    def send_frame(self, opcode, payload=b''):
+        header = FRAME_HEADER.pack(len(payload), opcode)
+        self.connection.sendall(header + payload)
+
+    def _fill(self, size):
+        while self.end - self.start < size:
+            if self.start + size > len(self.buffer):
+                # Move the partial frame to the front
+                remaining = self.end - self.start
+                self.view[:remaining] = self.view[self.start:self.end]
+                self.start = 0
+                self.end = remaining
+            count = self.connection.recv_into(self.view[self.end:])
+            if not count:
+                raise EOFError('Connection closed')
+            self.end += count
+
+    def receive_frame(self):
+        # Reads as much as the socket has into one reused
+        # buffer, so the returned payload is only valid until
+        # the next call.
+        self._fill(FRAME_HEADER.size)
+        length, opcode = FRAME_HEADER.unpack_from(
+            self.buffer, self.start)
+        if length > MAX_PAYLOAD:
+            raise UnknownCommandError(f'Frame too long: {length}')
+        self._fill(FRAME_HEADER.size + length)
+        begin = self.start + FRAME_HEADER.size
+        self.start = begin + length
+        return opcode, self.view[begin:self.start]
+
+
+# Example 36
+class NegotiatingSession(BinaryConnectionBase, Session):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.pushed_back = None
+
+    def receive(self):
+        if self.pushed_back is not None:
+            command = self.pushed_back
+            self.pushed_back = None
+            return command
+        return super().receive()
+
+    def loop(self):
+        # Old clients start talking right away; new ones
+        # first ask to switch to binary frames.
+        command = self.receive()
+        if command == 'HELLO binary':
+            self.send('binary')
+            self.binary = True
+            self.binary_loop()
+        else:
+            self.pushed_back = command
+            super().loop()
+
+    def binary_loop(self):
+        while True:
+            opcode, payload = self.receive_frame()
+            if opcode == OP_PARAMS:
+                lower, upper = PARAMS_FIELDS.unpack(payload)
+                self._clear_state(lower, upper)
+            elif opcode == OP_NUMBER:
+                guess = self.next_guess()
+                self.guesses.append(guess)
+                self.send_frame(
+                    OP_ANSWER, NUMBER_FIELD.pack(guess))
+            elif opcode == OP_REPORT:
+                (code,) = DECISION_FIELD.unpack(payload)
+                self.receive_report(['REPORT', DECISIONS[code]])
+            else:
+                raise UnknownCommandError(opcode)
+
+
+# Example 37
+class BinaryClient(BinaryConnectionBase, Client):
+    def negotiate(self):
+        self.send('HELLO binary')
+        self.binary = self.receive() == 'binary'
+
+    def send(self, command):
+        if not self.binary:
+            return super().send(command)
+
+        parts = command.split(' ')
+        if parts[0] == 'PARAMS':
+            payload = PARAMS_FIELDS.pack(
+                int(parts[1]), int(parts[2]))
+            self.send_frame(OP_PARAMS, payload)
+        elif parts[0] == 'NUMBER':
+            self.send_frame(OP_NUMBER)
+        elif parts[0] == 'REPORT':
+            code = DECISION_CODES[parts[1]]
+            self.send_frame(OP_REPORT, DECISION_FIELD.pack(code))
+        else:
+            raise UnknownCommandError(command)
+
+    def receive(self):
+        if not self.binary:
+            return super().receive()
+
+        opcode, payload = self.receive_frame()
+        if opcode != OP_ANSWER:
+            raise UnknownCommandError(opcode)
+        (number,) = NUMBER_FIELD.unpack(payload)
+        return number
+
+
+# Example 38
+def handle_negotiating_connection(connection):
+    with connection:
+        session = NegotiatingSession(connection)
+        try:
+            session.loop()
+        except EOFError:
+            pass
+
+def serve(listener, handler):
+    with listener:
+        while True:
+            connection, _ = listener.accept()
+            thread = Thread(target=handler,
+                            args=(connection,),
+                            daemon=True)
+            thread.start()
+
+def play_client(client):
+    with client.session(1, 5, 3):
+        results = [(x, client.report_outcome(x))
+                   for x in client.request_numbers(5)]
+
+    with client.session(10, 15, 12):
+        for number in client.request_numbers(10):
+            outcome = client.report_outcome(number)
+            results.append((number, outcome))
+
+    return results
+
+# Listen before starting the thread so clients can't race it
+listener = socket.socket()
+listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+listener.bind(('127.0.0.1', 1235))
+listener.listen()
+Thread(target=serve,
+       args=(listener, handle_negotiating_connection),
+       daemon=True).start()
+
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    # An old text-only client still works
+    with socket.create_connection(('127.0.0.1', 1235)) as conn:
+        text_results = play_client(Client(conn))
+
+    with socket.create_connection(('127.0.0.1', 1235)) as conn:
+        client = BinaryClient(conn)
+        client.negotiate()
+        assert client.binary
+        binary_results = play_client(client)
+
+for results in (text_results, binary_results):
+    assert (3, CORRECT) in results
+    assert (12, CORRECT) in results
+    assert results[-1] == (12, CORRECT)
+
+
+# Example 39
+def time_commands(client, count):
+    # REPORT has no reply, so without this Nagle's algorithm
+    # holds back each following NUMBER for a delayed ACK.
+    client.connection.setsockopt(
+        socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    start = time.perf_counter()
+    with client.session(1, 10 ** 9, 0):
+        for number in client.request_numbers(count):
+            client.send(f'REPORT {UNSURE}')
+    return time.perf_counter() - start
+
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    with socket.create_connection(('127.0.0.1', 1235)) as conn:
+        text_time = time_commands(Client(conn), 2000)
+
+    with socket.create_connection(('127.0.0.1', 1235)) as conn:
+        client = BinaryClient(conn)
+        client.negotiate()
+        binary_time = time_commands(client, 2000)
+
+print(f'Text: {text_time * 1000:.0f}ms, '
+      f'binary: {binary_time * 1000:.0f}ms for 2000 requests')
+
+
+# Example 40
+class ShuffledGuesses:
+    def __init__(self, lower, upper):
+        self.lower = lower
+        self.remaining = upper - lower + 1
+        # Fisher-Yates over a virtual range, storing only the
+        # positions that have been swapped so far
+        self.swapped = {}
+
+    def next_guess(self):
+        if not self.remaining:
+            raise IndexError('Every number was guessed')
+        index = random.randrange(self.remaining)
+        self.remaining -= 1
+        value = self.swapped.get(index, index)
+        last = self.swapped.pop(self.remaining, self.remaining)
+        if index != self.remaining:
+            self.swapped[index] = last
+        return self.lower + value
+
+    def report(self, decision):
+        pass
+
+guesses = ShuffledGuesses(10, 29)
+seen = [guesses.next_guess() for _ in range(20)]
+assert sorted(seen) == list(range(10, 30))
+assert not guesses.swapped
+try:
+    guesses.next_guess()
+except IndexError:
+    pass
+else:
+    assert False
+
+guesses = ShuffledGuesses(1, 10 ** 12)
+seen = {guesses.next_guess() for _ in range(1000)}
+assert len(seen) == 1000
+assert len(guesses.swapped) <= 1000
+
+
+# Example 41
+import itertools
+
+class IntervalSearch:
+    def __init__(self, lower, upper):
+        self.lower = lower
+        self.upper = upper
+        self.previous = None
+        self.last = None
+
+    def next_guess(self):
+        if self.last is None:
+            guess = self.lower
+        else:
+            # Mirror the last guess around the middle so the
+            # next report splits the interval in half
+            guess = self.lower + self.upper - self.last
+            guess = min(max(guess, self.lower), self.upper)
+            if guess == self.last:
+                if guess < self.upper:
+                    guess += 1
+                else:
+                    guess -= 1
+        self.previous, self.last = self.last, guess
+        return guess
+
+    def report(self, decision):
+        if decision == CORRECT:
+            self.lower = self.upper = self.last
+            return
+        if self.previous is None:
+            return  # The first report has nothing to compare
+
+        total = self.previous + self.last
+        if decision == UNSURE:
+            # Equally far from both, so it's right in between
+            if total % 2 == 0:
+                self.lower = self.upper = total // 2
+        elif (decision == WARMER) == (self.last > self.previous):
+            self.lower = max(self.lower, total // 2 + 1)
+        else:
+            self.upper = min(self.upper, (total + 1) // 2 - 1)
+
+def play_locally(guesser, secret):
+    last_distance = None
+    for count in itertools.count(1):
+        guess = guesser.next_guess()
+        distance = abs(guess - secret)
+        if distance == 0:
+            return count
+        if last_distance is None or distance == last_distance:
+            guesser.report(UNSURE)
+        elif distance < last_distance:
+            guesser.report(WARMER)
+        else:
+            guesser.report(COLDER)
+        last_distance = distance
+
+for secret in range(1, 101):
+    assert play_locally(IntervalSearch(1, 100), secret) <= 16
+
+rounds = play_locally(IntervalSearch(1, 10 ** 9), 765_432_101)
+assert rounds <= 2 * math.ceil(math.log2(10 ** 9)) + 2, rounds
+print(f'Found the secret in {rounds} rounds')
+
+
+# Example 42
+import functools
+
+class SearchingSession(Session):
+    def __init__(self, *args, guesser_class=ShuffledGuesses):
+        self.guesser_class = guesser_class
+        super().__init__(*args)
+
+    def _clear_state(self, lower, upper):
+        super()._clear_state(lower, upper)
+        self.guesser = None
+        if lower is not None and lower <= upper:
+            self.guesser = self.guesser_class(lower, upper)
+
+    def next_guess(self):
+        if self.secret is not None:
+            return self.secret
+        return self.guesser.next_guess()
+
+    def receive_report(self, parts):
+        super().receive_report(parts)
+        self.guesser.report(parts[1])
+
+def handle_searching_connection(connection, guesser_class):
+    with connection:
+        session = SearchingSession(
+            connection, guesser_class=guesser_class)
+        try:
+            session.loop()
+        except EOFError:
+            pass
+
+def count_rounds(address, lower, upper, secret):
+    with socket.create_connection(address) as conn:
+        client = Client(conn)
+        with client.session(lower, upper, secret):
+            outcomes = [client.report_outcome(number)
+                        for number in client.request_numbers(100)]
+    assert outcomes[-1] == CORRECT
+    return len(outcomes)
+
+servers = [
+    (('127.0.0.1', 1236), ShuffledGuesses),
+    (('127.0.0.1', 1237), IntervalSearch),
+]
+for address, guesser_class in servers:
+    listener = socket.socket()
+    listener.setsockopt(
+        socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(address)
+    listener.listen()
+    handler = functools.partial(
+        handle_searching_connection,
+        guesser_class=guesser_class)
+    Thread(target=serve, args=(listener, handler),
+           daemon=True).start()
+
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    # Random guesses never repeat, so 50 numbers take at most 50
+    shuffled = count_rounds(servers[0][0], 1, 50, 37)
+    searched = count_rounds(servers[1][0], 1, 10 ** 6, 123_456)
+
+assert shuffled <= 50
+assert searched <= 2 * math.ceil(math.log2(10 ** 6)) + 2
+print(f'Shuffled: {shuffled} rounds for 50 numbers, '
+      f'interval search: {searched} rounds for a million')
+
+
+# Example 43
+from threading import Condition
+
+def is_healthy(connection):
+    # A closed peer reads as b'' and a healthy idle one has
+    # nothing to read; stray data means the state is unknown.
+    try:
+        connection.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    return False
+
+class ConnectionPool:
+    def __init__(self, address, max_size=10, max_idle=30,
+                 client_class=Client):
+        self.address = address
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.client_class = client_class
+        self.condition = Condition()
+        self.idle = deque()  # (client, returned at), oldest first
+        self.size = 0        # Idle plus leased connections
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _close(self, client):
+        self.size -= 1
+        self.discarded += 1
+        client.file.close()
+        client.connection.close()
+
+    def _evict_idle(self):
+        deadline = time.monotonic() - self.max_idle
+        while self.idle and self.idle[0][1] < deadline:
+            client, _ = self.idle.popleft()
+            self._close(client)
+
+    def _acquire(self):
+        with self.condition:
+            while True:
+                self._evict_idle()
+                while self.idle:
+                    client, _ = self.idle.pop()  # Warmest first
+                    if is_healthy(client.connection):
+                        self.reused += 1
+                        return client
+                    self._close(client)
+                if self.size < self.max_size:
+                    self.size += 1
+                    self.created += 1
+                    break
+                self.condition.wait()
+
+        try:
+            connection = socket.create_connection(self.address)
+        except OSError:
+            with self.condition:
+                self.size -= 1
+                self.created -= 1
+                self.condition.notify()
+            raise
+        # Sessions on a reused connection start with two writes
+        # that get no reply, which Nagle would hold back.
+        connection.setsockopt(
+            socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self.client_class(connection)
+
+    def _release(self, client, healthy):
+        with self.condition:
+            if healthy:
+                self.idle.append((client, time.monotonic()))
+            else:
+                self._close(client)
+            self.condition.notify()
+
+    @contextlib.contextmanager
+    def lease(self):
+        client = self._acquire()
+        try:
+            yield client
+        except:
+            # The server may be mid-session; don't reuse it
+            self._release(client, False)
+            raise
+        else:
+            self._release(client, True)
+
+    def close(self):
+        with self.condition:
+            while self.idle:
+                client, _ = self.idle.popleft()
+                self._close(client)
+
+
+# Example 44
+from concurrent.futures import ThreadPoolExecutor
+
+def play_pooled(pool, secret):
+    with pool.lease() as client:
+        with client.session(1, 5, secret):
+            for number in client.request_numbers(5):
+                outcome = client.report_outcome(number)
+        return outcome
+
+def play_unpooled(address, secret):
+    with socket.create_connection(address) as connection:
+        connection.setsockopt(
+            socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = Client(connection)
+        with client.session(1, 5, secret):
+            for number in client.request_numbers(5):
+                outcome = client.report_outcome(number)
+        client.file.close()
+        return outcome
+
+address = ('127.0.0.1', 1235)  # From Example 38
+secrets = [random.randint(1, 5) for _ in range(400)]
+pool = ConnectionPool(address, max_size=8)
+
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    with ThreadPoolExecutor(16) as executor:
+        start = time.perf_counter()
+        outcomes = list(executor.map(
+            functools.partial(play_unpooled, address), secrets))
+        unpooled_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pooled = list(executor.map(
+            functools.partial(play_pooled, pool), secrets))
+        pooled_time = time.perf_counter() - start
+
+assert outcomes == pooled == [CORRECT] * len(secrets)
+assert pool.created <= 8
+assert pool.created + pool.reused == len(secrets)
+print(f'Unpooled: {unpooled_time * 1000:.0f}ms, '
+      f'pooled: {pooled_time * 1000:.0f}ms for '
+      f'{len(secrets)} sessions over {pool.created} connections')
+
+# Broken connections fail the health check
+client, _ = pool.idle[-1]
+client.connection.shutdown(socket.SHUT_RDWR)
+with contextlib.redirect_stdout(output):
+    assert play_pooled(pool, 3) == CORRECT
+assert pool.discarded == 1
+
+# Connections idle for too long are closed
+pool.max_idle = 0.1
+time.sleep(0.2)
+idle_count = len(pool.idle)
+discarded = pool.discarded
+with contextlib.redirect_stdout(output):
+    play_pooled(pool, 3)
+assert pool.discarded == discarded + idle_count
+assert len(pool.idle) == 1
+pool.close()
+
+
+# Example 45
+class AsyncConnectionPool:
+    def __init__(self, address, max_size=10, max_idle=30,
+                 client_class=AsyncClient):
+        self.address = address
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.client_class = client_class
+        self.condition = asyncio.Condition()
+        self.idle = deque()  # (client, returned at), oldest first
+        self.size = 0
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _close(self, client):
+        self.size -= 1
+        self.discarded += 1
+        client.writer.close()
+
+    def _evict_idle(self):
+        deadline = time.monotonic() - self.max_idle
+        while self.idle and self.idle[0][1] < deadline:
+            client, _ = self.idle.popleft()
+            self._close(client)
+
+    async def _acquire(self):
+        async with self.condition:
+            while True:
+                self._evict_idle()
+                while self.idle:
+                    client, _ = self.idle.pop()
+                    # The event loop has already seen any EOF
+                    if not (client.reader.at_eof() or
+                            client.writer.is_closing()):
+                        self.reused += 1
+                        return client
+                    self._close(client)
+                if self.size < self.max_size:
+                    self.size += 1
+                    self.created += 1
+                    break
+                await self.condition.wait()
+
+        try:
+            streams = await asyncio.open_connection(*self.address)
+        except OSError:
+            async with self.condition:
+                self.size -= 1
+                self.created -= 1
+                self.condition.notify()
+            raise
+        return self.client_class(*streams)
+
+    async def _release(self, client, healthy):
+        async with self.condition:
+            if healthy:
+                self.idle.append((client, time.monotonic()))
+            else:
+                self._close(client)
+            self.condition.notify()
+
+    @contextlib.asynccontextmanager
+    async def lease(self):
+        client = await self._acquire()
+        try:
+            yield client
+        except:
+            await self._release(client, False)
+            raise
+        else:
+            await self._release(client, True)
+
+    async def close(self):
+        async with self.condition:
+            while self.idle:
+                client, _ = self.idle.popleft()
+                self._close(client)
+                await client.writer.wait_closed()
+
+
+# Example 46
+async def play_async_pooled(pool, secret):
+    async with pool.lease() as client:
+        async with client.session(1, 5, secret):
+            async for number in client.request_numbers(5):
+                outcome = await client.report_outcome(number)
+        return outcome
+
+async def check_async_pool(address, secrets):
+    pool = AsyncConnectionPool(address, max_size=10)
+    outcomes = await asyncio.gather(
+        *[play_async_pooled(pool, x) for x in secrets])
+    assert outcomes == [CORRECT] * len(secrets)
+    assert pool.created <= 10
+    assert pool.created + pool.reused == len(secrets)
+
+    # Closed connections are discarded, not leased
+    client, _ = pool.idle[-1]
+    client.writer.close()
+    await client.writer.wait_closed()
+    assert await play_async_pooled(pool, 3) == CORRECT
+    assert pool.discarded == 1
+
+    await pool.close()
+    return pool.created
+
+address = ('127.0.0.1', 4325)  # From Example 34
+secrets = [random.randint(1, 5) for _ in range(50)]
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    created = asyncio.run(check_async_pool(address, secrets))
+print(f'{len(secrets)} async sessions over {created} connections')
@@ -0,0 +1,364 @@
+#!/usr/bin/env PYTHONHASHSEED=1234 python3
+
+# Copyright 2014-2019 Brett Slatkin, Pearson Education Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The servers below are copied from item_61.py, which runs
+# all of its examples when imported. Keep them in sync so
+# the load test exercises the same code. Only AsyncClient
+# differs: it drops the printing and the sleep that keep the
+# book's output in order.
+
+import asyncio
+import contextlib
+import logging
+import math
+import random
+import socket
+from threading import Thread
+
+WARMER = 'Warmer'
+COLDER = 'Colder'
+UNSURE = 'Unsure'
+CORRECT = 'Correct'
+
+class EOFError(Exception):
+    pass
+
+class UnknownCommandError(Exception):
+    pass
+
+# Item 61, Examples 1-6
+class ConnectionBase:
+    def __init__(self, connection):
+        self.connection = connection
+        self.file = connection.makefile('rb')
+
+    def send(self, command):
+        line = command + '\n'
+        data = line.encode()
+        self.connection.send(data)
+
+    def receive(self):
+        line = self.file.readline()
+        if not line:
+            raise EOFError('Connection closed')
+        return line[:-1].decode()
+
+class Session(ConnectionBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._clear_state(None, None)
+
+    def _clear_state(self, lower, upper):
+        self.lower = lower
+        self.upper = upper
+        self.secret = None
+        self.guesses = []
+
+    def loop(self):
+        while command := self.receive():
+            parts = command.split(' ')
+            if parts[0] == 'PARAMS':
+                self.set_params(parts)
+            elif parts[0] == 'NUMBER':
+                self.send_number()
+            elif parts[0] == 'REPORT':
+                self.receive_report(parts)
+            else:
+                raise UnknownCommandError(command)
+
+    def set_params(self, parts):
+        assert len(parts) == 3
+        lower = int(parts[1])
+        upper = int(parts[2])
+        self._clear_state(lower, upper)
+
+    def next_guess(self):
+        if self.secret is not None:
+            return self.secret
+
+        while True:
+            guess = random.randint(self.lower, self.upper)
+            if guess not in self.guesses:
+                return guess
+
+    def send_number(self):
+        guess = self.next_guess()
+        self.guesses.append(guess)
+        self.send(format(guess))
+
+    def receive_report(self, parts):
+        assert len(parts) == 2
+        decision = parts[1]
+
+        last = self.guesses[-1]
+        if decision == CORRECT:
+            self.secret = last
+
+        print(f'Server: {last} is {decision}')
+
+# Item 61, Example 11
+def handle_connection(connection):
+    with connection:
+        session = Session(connection)
+        try:
+            session.loop()
+        except EOFError:
+            pass
+
+def run_server(address):
+    with socket.socket() as listener:
+        # Allow the port to be reused
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(address)
+        listener.listen()
+        while True:
+            connection, _ = listener.accept()
+            thread = Thread(target=handle_connection,
+                            args=(connection,),
+                            daemon=True)
+            thread.start()
+
+# Item 61, Examples 14-19
+class AsyncConnectionBase:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, command):
+        line = command + '\n'
+        data = line.encode()
+        self.writer.write(data)
+        await self.writer.drain()
+
+    async def receive(self):
+        line = await self.reader.readline()
+        if not line:
+            raise EOFError('Connection closed')
+        return line[:-1].decode()
+
+class AsyncSession(AsyncConnectionBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._clear_values(None, None)
+
+    def _clear_values(self, lower, upper):
+        self.lower = lower
+        self.upper = upper
+        self.secret = None
+        self.guesses = []
+
+    async def loop(self):
+        while command := await self.receive():
+            parts = command.split(' ')
+            if parts[0] == 'PARAMS':
+                self.set_params(parts)
+            elif parts[0] == 'NUMBER':
+                await self.send_number()
+            elif parts[0] == 'REPORT':
+                self.receive_report(parts)
+            else:
+                raise UnknownCommandError(command)
+
+    def set_params(self, parts):
+        assert len(parts) == 3
+        lower = int(parts[1])
+        upper = int(parts[2])
+        self._clear_values(lower, upper)
+
+    def next_guess(self):
+        if self.secret is not None:
+            return self.secret
+
+        while True:
+            guess = random.randint(self.lower, self.upper)
+            if guess not in self.guesses:
+                return guess
+
+    async def send_number(self):
+        guess = self.next_guess()
+        self.guesses.append(guess)
+        await self.send(format(guess))
+
+    def receive_report(self, parts):
+        assert len(parts) == 2
+        decision = parts[1]
+
+        last = self.guesses[-1]
+        if decision == CORRECT:
+            self.secret = last
+
+        print(f'Server: {last} is {decision}')
+
+# Item 61, Example 24
+async def handle_async_connection(reader, writer):
+    session = AsyncSession(reader, writer)
+    try:
+        await session.loop()
+    except EOFError:
+        pass
+
+async def run_async_server(address):
+    server = await asyncio.start_server(
+        handle_async_connection, *address)
+    async with server:
+        await server.serve_forever()
+
+# Item 61, Examples 27-28
+class IdleTimeoutSession(AsyncSession):
+    def __init__(self, *args, idle_timeout=None):
+        super().__init__(*args)
+        self.idle_timeout = idle_timeout
+        self.timed_out = False
+
+    async def receive(self):
+        if self.idle_timeout is None:
+            return await super().receive()
+
+        # A timer is much cheaper than the extra task that
+        # asyncio.wait_for creates for every command.
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(self.idle_timeout, self.expire)
+        try:
+            return await super().receive()
+        finally:
+            timer.cancel()
+
+    def expire(self):
+        # Closing makes the pending receive raise EOFError
+        self.timed_out = True
+        self.writer.close()
+
+class AsyncGameServer:
+    session_class = IdleTimeoutSession
+
+    def __init__(self, address, max_connections=1000,
+                 idle_timeout=60):
+        self.address = address
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.active = {}  # Session tasks to their writers
+        self.accepted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.errors = 0
+
+    async def start(self):
+        backlog = min(self.max_connections, socket.SOMAXCONN)
+        self.server = await asyncio.start_server(
+            self.handle_connection, *self.address,
+            backlog=backlog)
+
+    async def handle_connection(self, reader, writer):
+        if len(self.active) >= self.max_connections:
+            self.rejected += 1
+            writer.close()
+            return
+
+        self.accepted += 1
+        task = asyncio.current_task()
+        self.active[task] = writer
+        session = self.session_class(
+            reader, writer, idle_timeout=self.idle_timeout)
+        try:
+            await session.loop()
+        except (EOFError, ConnectionError):
+            pass
+        except Exception:
+            # A bad client shouldn't take down the server
+            self.errors += 1
+            logging.exception('Session failed')
+        finally:
+            del self.active[task]
+            writer.close()
+            if session.timed_out:
+                self.timed_out += 1
+
+    async def shutdown(self, drain_timeout=10):
+        # Stop accepting, then give open sessions a chance
+        # to finish before closing whatever is left.
+        self.server.close()
+        if self.active:
+            _, pending = await asyncio.wait(
+                self.active, timeout=drain_timeout)
+            for task in pending:
+                self.active[task].close()
+            if pending:
+                await asyncio.wait(pending)
+        await self.server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.shutdown()
+
+    async def serve_forever(self):
+        async with self:
+            await self.server.serve_forever()
+
+# Load generator side
+def make_listener(address, reuse_port=False):
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        listener.setsockopt(
+            socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    listener.bind(address)
+    listener.listen(socket.SOMAXCONN)
+    return listener
+
+class AsyncClient(AsyncConnectionBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._clear_state()
+
+    def _clear_state(self):
+        self.secret = None
+        self.last_distance = None
+
+    @contextlib.asynccontextmanager
+    async def session(self, lower, upper, secret):
+        self.secret = secret
+        await self.send(f'PARAMS {lower} {upper}')
+        try:
+            yield
+        finally:
+            self._clear_state()
+            await self.send('PARAMS 0 -1')
+
+    async def request_number(self):
+        await self.send('NUMBER')
+        return int(await self.receive())
+
+    async def report_outcome(self, number):
+        new_distance = math.fabs(number - self.secret)
+        decision = UNSURE
+
+        if new_distance == 0:
+            decision = CORRECT
+        elif self.last_distance is None:
+            pass
+        elif new_distance < self.last_distance:
+            decision = WARMER
+        elif new_distance > self.last_distance:
+            decision = COLDER
+
+        self.last_distance = new_distance
+
+        await self.send(f'REPORT {decision}')
+        return decision
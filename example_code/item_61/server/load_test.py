@@ -0,0 +1,334 @@
+#!/usr/bin/env PYTHONHASHSEED=1234 python3
+
+# Copyright 2014-2019 Brett Slatkin, Pearson Education Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows
+
+from threading import Thread
+
+import game
+import prefork
+
+class LatencyHistogram:
+    # Log-spaced buckets keep memory fixed no matter how many
+    # samples are recorded, with about 4% error per bucket.
+    BUCKETS_PER_DOUBLING = 16
+
+    def __init__(self):
+        self.buckets = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        micros = max(seconds * 1e6, 1)
+        bucket = int(math.log2(micros) * self.BUCKETS_PER_DOUBLING)
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def _upper_bound(self, bucket):
+        return 2 ** ((bucket + 1) / self.BUCKETS_PER_DOUBLING) / 1e6
+
+    def percentile(self, fraction):
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self._upper_bound(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        def millis(seconds):
+            if seconds is None:
+                return None
+            return round(seconds * 1000, 3)
+
+        mean = self.total / self.count if self.count else None
+        return {
+            'count': self.count,
+            'mean_ms': millis(mean),
+            'p50_ms': millis(self.percentile(0.5)),
+            'p95_ms': millis(self.percentile(0.95)),
+            'p99_ms': millis(self.percentile(0.99)),
+            'max_ms': millis(self.max if self.count else None),
+            'histogram_ms': [
+                [millis(self._upper_bound(bucket)), count]
+                for bucket, count in sorted(self.buckets.items())],
+        }
+
+class LoadStats:
+    def __init__(self):
+        self.connect = LatencyHistogram()
+        # PARAMS and REPORT have no reply, so NUMBER is the only
+        # command with a round trip to time.
+        self.number = LatencyHistogram()
+        self.session = LatencyHistogram()
+        self.errors = collections.Counter()
+
+    def record_error(self, error):
+        self.errors[type(error).__name__] += 1
+
+def raise_open_file_limit():
+    # Each client needs a descriptor on both ends
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+async def play_sessions(client, args, stats, rng):
+    interval = 1 / args.request_rate if args.request_rate else 0
+    for _ in range(args.sessions):
+        secret = rng.randint(args.lower, args.upper)
+        start = time.perf_counter()
+        async with client.session(args.lower, args.upper, secret):
+            for _ in range(args.requests):
+                sent = time.perf_counter()
+                number = await client.request_number()
+                stats.number.record(time.perf_counter() - sent)
+                outcome = await client.report_outcome(number)
+                if outcome == game.CORRECT:
+                    break
+                if interval:
+                    await asyncio.sleep(interval)
+        stats.session.record(time.perf_counter() - start)
+
+async def run_client(address, args, stats, rng):
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(*address), args.timeout)
+    except (OSError, asyncio.TimeoutError) as e:
+        stats.record_error(e)
+        return
+    stats.connect.record(time.perf_counter() - start)
+
+    client = game.AsyncClient(reader, writer)
+    try:
+        await asyncio.wait_for(
+            play_sessions(client, args, stats, rng),
+            args.timeout)
+    except (OSError, game.EOFError, asyncio.TimeoutError) as e:
+        stats.record_error(e)
+    finally:
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+
+async def generate_load(address, args):
+    stats = LoadStats()
+    rng = random.Random(args.seed)
+    delay = 1 / args.connect_rate if args.connect_rate else 0
+
+    start = time.perf_counter()
+    tasks = []
+    for _ in range(args.clients):
+        client_rng = random.Random(rng.getrandbits(64))
+        coro = run_client(address, args, stats, client_rng)
+        tasks.append(asyncio.create_task(coro))
+        if delay:
+            await asyncio.sleep(delay)
+    await asyncio.gather(*tasks)
+    return stats, time.perf_counter() - start
+
+def start_server(kind, address, max_connections, idle_timeout):
+    raise_open_file_limit()
+    # The sessions print every report, as in the book
+    sys.stdout = open(os.devnull, 'w')
+    if kind == 'threaded':
+        game.run_server(address)
+    elif kind == 'async':
+        asyncio.run(game.run_async_server(address))
+    else:
+        server = game.AsyncGameServer(
+            address, max_connections=max_connections,
+            idle_timeout=idle_timeout)
+        asyncio.run(server.serve_forever())
+
+@contextlib.contextmanager
+def local_server(args, address):
+    if args.server == 'none':
+        yield None
+    elif args.server == 'prefork':
+        # The supervisor starts the workers itself; a daemon
+        # process wouldn't be allowed to.
+        server = prefork.PreforkServer(address, args.workers)
+        with server:
+            # Restart crashed workers while the load runs
+            Thread(target=server.supervise, daemon=True).start()
+            yield server
+    else:
+        process = multiprocessing.Process(
+            target=start_server,
+            args=(args.server, address, args.max_connections,
+                  args.idle_timeout),
+            daemon=True)
+        process.start()
+        try:
+            yield process
+        finally:
+            process.terminate()
+            process.join()
+
+def wait_for_server(address, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(address):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+def find_regressions(report, baseline, tolerance):
+    problems = []
+    for histogram in ('connect', 'number'):
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            before = baseline[histogram][key]
+            after = report[histogram][key]
+            if before and after and after > before * (1 + tolerance):
+                problems.append(
+                    f'{histogram} {key}: {before} -> {after}')
+    if report['error_count'] > baseline['error_count']:
+        problems.append(
+            f'errors: {baseline["error_count"]} -> '
+            f'{report["error_count"]}')
+    return problems
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Load test the number guessing server')
+    parser.add_argument(
+        '--server',
+        choices=['threaded', 'async', 'game', 'prefork', 'none'],
+        default='game',
+        help='Server to start locally: run_server, '
+             'run_async_server, AsyncGameServer, the prefork '
+             'workers, or none to use one already running')
+    parser.add_argument(
+        '--max-connections', type=int, default=10_000,
+        help='Connection cap for AsyncGameServer')
+    parser.add_argument(
+        '--idle-timeout', type=float, default=60,
+        help='Idle timeout for AsyncGameServer')
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='Worker processes for the prefork server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4400)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument(
+        '--connect-rate', type=float, default=0,
+        help='Clients started per second; 0 starts all at once')
+    parser.add_argument(
+        '--request-rate', type=float, default=0,
+        help='NUMBER requests per second for each client; '
+             '0 sends them back to back')
+    parser.add_argument('--sessions', type=int, default=3,
+                        help='Sessions played by each client')
+    parser.add_argument('--requests', type=int, default=20,
+                        help='Most NUMBER requests per session')
+    parser.add_argument('--lower', type=int, default=1)
+    parser.add_argument('--upper', type=int, default=100)
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='Seconds before a client gives up')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument(
+        '--output', help='Write JSON here instead of stdout')
+    parser.add_argument(
+        '--baseline', help='Earlier JSON report to compare with')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='Allowed fractional latency increase over baseline')
+    args = parser.parse_args()
+    if args.requests > args.upper - args.lower + 1:
+        # Session.next_guess never repeats a number, so it
+        # would spin forever once every one was guessed.
+        parser.error('--requests must fit in the guess range')
+    return args
+
+def main():
+    args = parse_args()
+    raise_open_file_limit()
+    address = (args.host, args.port)
+
+    with local_server(args, address) as server:
+        wait_for_server(address)
+        stats, elapsed = asyncio.run(generate_load(address, args))
+        server_stats = None
+        if args.server == 'prefork':
+            server_stats = server.wait_idle()
+
+    report = {
+        'server': args.server,
+        'clients': args.clients,
+        'connect_rate': args.connect_rate,
+        'request_rate': args.request_rate,
+        'sessions': args.sessions,
+        'requests': args.requests,
+        'lower': args.lower,
+        'upper': args.upper,
+        'elapsed_seconds': round(elapsed, 3),
+        'requests_per_second': round(
+            stats.number.count / elapsed, 1),
+        'connect': stats.connect.summary(),
+        'number': stats.number.summary(),
+        'session': stats.session.summary(),
+        'errors': dict(stats.errors),
+        'error_count': sum(stats.errors.values()),
+    }
+    if server_stats is not None:
+        report['server_stats'] = server_stats
+
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    else:
+        print(data)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = find_regressions(report, baseline, args.tolerance)
+        for problem in problems:
+            print(f'Regression: {problem}', file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env PYTHONHASHSEED=1234 python3
+
+# Copyright 2014-2019 Brett Slatkin, Pearson Education Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+
+from threading import Event, Lock
+
+import game
+
+# Counters each worker keeps in its own slot of a shared array
+STAT_FIELDS = ('connections', 'active', 'commands', 'errors')
+
+class CountingSession(game.AsyncSession):
+    def __init__(self, stats, *args):
+        super().__init__(*args)
+        self.stats = stats
+
+    async def receive(self):
+        command = await super().receive()
+        self.stats.increment('commands')
+        return command
+
+class WorkerStats:
+    def __init__(self, array, slot):
+        self.array = array
+        self.offset = slot * len(STAT_FIELDS)
+
+    def increment(self, field, amount=1):
+        # Only this worker writes its slot, so no lock is needed
+        self.array[self.offset + STAT_FIELDS.index(field)] += amount
+
+    def reset(self, field):
+        self.array[self.offset + STAT_FIELDS.index(field)] = 0
+
+async def serve_worker(listener, stats):
+    async def handle_connection(reader, writer):
+        stats.increment('connections')
+        stats.increment('active')
+        session = CountingSession(stats, reader, writer)
+        try:
+            await session.loop()
+        except (game.EOFError, ConnectionError):
+            pass
+        except Exception:
+            stats.increment('errors')
+            logging.exception('Session failed')
+        finally:
+            stats.increment('active', -1)
+            writer.close()
+
+    server = await asyncio.start_server(
+        handle_connection, sock=listener,
+        backlog=socket.SOMAXCONN)
+    async with server:
+        await server.serve_forever()
+
+def run_worker(address, listener, array, slot):
+    # Let the supervisor's SIGINT handling stop everything
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # The sessions print every report, as in the book
+    sys.stdout = open(os.devnull, 'w')
+    if listener is None:
+        listener = game.make_listener(address, reuse_port=True)
+    stats = WorkerStats(array, slot)
+    stats.reset('active')  # Left over if the last worker crashed
+    asyncio.run(serve_worker(listener, stats))
+
+class PreforkServer:
+    def __init__(self, address, workers=None, reuse_port=None,
+                 restart_delay=1):
+        if workers is None:
+            workers = os.cpu_count()
+        if reuse_port is None:
+            reuse_port = hasattr(socket, 'SO_REUSEPORT')
+        self.address = address
+        self.workers = workers
+        self.reuse_port = reuse_port
+        self.restart_delay = restart_delay
+        self.listener = None
+        # A forked worker would inherit every socket the parent
+        # has open, such as a load generator's clients, and keep
+        # those connections from ever closing.
+        self.context = multiprocessing.get_context('spawn')
+        self.array = self.context.Array(
+            'q', workers * len(STAT_FIELDS), lock=False)
+        self.processes = [None] * workers
+        self.started = [0.0] * workers
+        self.restarts = 0
+        # Lets a supervisor thread run alongside other work
+        self.lock = Lock()
+        self.stopping = Event()
+
+    def start(self):
+        if not self.reuse_port:
+            # Workers share one inherited listening socket
+            self.listener = game.make_listener(self.address)
+        for slot in range(self.workers):
+            self.start_worker(slot)
+
+    def start_worker(self, slot):
+        process = self.context.Process(
+            target=run_worker,
+            args=(self.address, self.listener, self.array, slot),
+            daemon=True)
+        process.start()
+        self.processes[slot] = process
+        self.started[slot] = time.monotonic()
+
+    def check_workers(self):
+        with self.lock:
+            if not self.stopping.is_set():
+                self._restart_dead_workers()
+
+    def _restart_dead_workers(self):
+        for slot, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+            # Don't spin if a worker dies right after starting
+            uptime = time.monotonic() - self.started[slot]
+            if uptime < self.restart_delay:
+                continue
+            logging.warning('Worker %d (pid %d) exited with %s, '
+                            'restarting', slot, process.pid,
+                            process.exitcode)
+            process.join()
+            self.restarts += 1
+            self.start_worker(slot)
+
+    def stats(self):
+        totals = dict.fromkeys(STAT_FIELDS, 0)
+        for slot in range(self.workers):
+            offset = slot * len(STAT_FIELDS)
+            for index, field in enumerate(STAT_FIELDS):
+                totals[field] += self.array[offset + index]
+        totals['workers'] = sum(
+            process.is_alive() for process in self.processes)
+        totals['restarts'] = self.restarts
+        return totals
+
+    def wait_idle(self, timeout=5):
+        # Workers notice closed connections a little after the
+        # clients close them, so let the counters settle.
+        deadline = time.monotonic() + timeout
+        while self.stats()['active'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self.stats()
+
+    def supervise(self, interval=0.5):
+        while not self.stopping.wait(interval):
+            self.check_workers()
+
+    def serve_forever(self, interval=0.5, report_every=None):
+        last_report = time.monotonic()
+        while not self.stopping.wait(interval):
+            self.check_workers()
+            now = time.monotonic()
+            if report_every and now - last_report >= report_every:
+                logging.info('Stats: %s', self.stats())
+                last_report = now
+
+    def stop(self):
+        with self.lock:
+            self.stopping.set()
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        if self.listener is not None:
+            self.listener.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+def run_prefork_server(address, workers=None, reuse_port=None):
+    with PreforkServer(address, workers, reuse_port) as server:
+        server.serve_forever()
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Run the guessing game server in several '
+                    'worker processes')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4400)
+    parser.add_argument('--workers', type=int,
+                        default=os.cpu_count())
+    parser.add_argument(
+        '--inherit', action='store_true',
+        help='Share one listening socket instead of binding '
+             'each worker with SO_REUSEPORT')
+    parser.add_argument('--report-every', type=float, default=5,
+                        help='Seconds between stats log lines')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(message)s')
+    address = (args.host, args.port)
+    reuse_port = False if args.inherit else None
+    with PreforkServer(address, args.workers, reuse_port) as server:
+        try:
+            server.serve_forever(report_every=args.report_every)
+        except KeyboardInterrupt:
+            pass
+        logging.info('Final stats: %s', server.stats())
+
+if __name__ == '__main__':
+    main()
@@ -293,3 +293,503 @@ run_threads(handles, 0.1, output_path)
 confirm_merge(input_paths, output_path)
 
 tmpdir.cleanup()
+
+
+# Example 13
+import io
+
+class BulkReader:
+    def __init__(self, handle, buffer_size=64 * 1024):
+        self.raw = handle.raw  # Skip the handle's own buffering
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.partial = b''
+        self.offset = 0  # Bytes read from the file so far
+        self.reads = 0
+
+    def read_lines(self):
+        count = self.raw.readinto(self.view)
+        self.reads += 1
+        if not count:
+            raise NoNewData
+        self.offset += count
+
+        end = self.buffer.rfind(b'\n', 0, count) + 1
+        if not end:
+            # Keep waiting for the end of a very long line
+            self.partial += self.view[:count]
+            return []
+
+        chunk = self.partial + self.view[:end]
+        self.partial = bytes(self.view[end:count])
+        # BytesIO splits on b'\n' only, like readline
+        return io.BytesIO(chunk).readlines()
+
+def tail_file_bulk(handle, interval, write_func):
+    reader = BulkReader(handle)
+    while not handle.closed:
+        try:
+            lines = reader.read_lines()
+        except NoNewData:
+            time.sleep(interval)
+        except (OSError, ValueError):
+            # Closed by another thread after the check above
+            break
+        else:
+            if lines:
+                write_func(lines)
+
+    if reader.partial:
+        write_func([reader.partial])
+
+def run_threads_bulk(handles, interval, output_path):
+    with open(output_path, 'wb') as output:
+        lock = Lock()
+        def write(lines):
+            with lock:
+                output.writelines(lines)
+
+        threads = []
+        for handle in handles:
+            args = (handle, interval, write)
+            thread = Thread(target=tail_file_bulk, args=args)
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+
+# Example 14
+input_paths = ...
+handles = ...
+output_path = ...
+
+tmpdir, input_paths, handles, output_path = setup()
+
+run_threads_bulk(handles, 0.1, output_path)
+
+confirm_merge(input_paths, output_path)
+
+tmpdir.cleanup()
+
+# The file can go away between the closed check and the read
+from types import SimpleNamespace
+
+with TemporaryDirectory() as tmpdir:
+    path = os.path.join(tmpdir, 'closing')
+    with open(path, 'wb') as f:
+        f.write(b'first\nsecond')
+
+    handle = open(path, 'rb')
+    # Looks open to the loop however often it checks
+    racing = SimpleNamespace(raw=handle.raw, closed=False)
+    written = []
+    def write_then_close(lines):
+        written.extend(lines)
+        handle.close()
+
+    tail_file_bulk(racing, 0.01, write_then_close)
+    assert written == [b'first\n', b'second']
+
+
+# Example 15
+with TemporaryDirectory() as tmpdir:
+    path = os.path.join(tmpdir, 'big')
+    with open(path, 'wb') as f:
+        for i in range(100_000):
+            f.write(f'{i:06} {"x" * 50}\n'.encode())
+
+    with open(path, 'rb') as handle:
+        start = time.perf_counter()
+        by_line = []
+        while True:
+            try:
+                by_line.append(readline(handle))
+            except NoNewData:
+                break
+        line_time = time.perf_counter() - start
+
+    with open(path, 'rb') as handle:
+        reader = BulkReader(handle)
+        start = time.perf_counter()
+        in_bulk = []
+        while True:
+            try:
+                in_bulk.extend(reader.read_lines())
+            except NoNewData:
+                break
+        bulk_time = time.perf_counter() - start
+
+assert in_bulk == by_line
+print(f'readline: {line_time * 1000:.0f}ms, '
+      f'bulk: {bulk_time * 1000:.0f}ms with '
+      f'{reader.reads} reads for {len(in_bulk)} lines')
+
+
+# Example 16
+import heapq
+
+class WatchedFile:
+    def __init__(self, handle, interval):
+        self.handle = handle
+        self.fd = handle.fileno()
+        stat = os.fstat(self.fd)
+        # Tells this file apart from whatever reuses its fd
+        self.identity = (stat.st_dev, stat.st_ino)
+        self.reader = BulkReader(handle)
+        self.interval = interval
+
+    def grew(self):
+        stat = os.fstat(self.fd)
+        if (stat.st_dev, stat.st_ino) != self.identity:
+            raise ValueError('File descriptor was reused')
+        return stat.st_size > self.reader.offset
+
+    def drain(self, write_func):
+        try:
+            while True:
+                lines = self.reader.read_lines()
+                if lines:
+                    write_func(lines)
+        except NoNewData:
+            pass
+
+def tail_many(handles, write_func, min_interval=0.01,
+              max_interval=1.0):
+    watched = [WatchedFile(handle, min_interval)
+               for handle in handles]
+    # Each entry is (next check time, index into watched)
+    schedule = [(0, i) for i in range(len(watched))]
+    stat_calls = 0
+
+    while schedule:
+        now = time.monotonic()
+        due = []
+        while schedule and schedule[0][0] <= now:
+            due.append(heapq.heappop(schedule)[1])
+
+        for index in due:
+            file = watched[index]
+            try:
+                if file.handle.closed:
+                    raise ValueError('File was closed')
+                stat_calls += 1
+                grew = file.grew()
+                if grew:
+                    file.drain(write_func)
+            except (OSError, ValueError):
+                # Another thread may close the handle at any
+                # point; stop tailing only this file.
+                if file.reader.partial:
+                    write_func([file.reader.partial])
+                continue
+
+            if grew:
+                # Poll again soon in case more is on the way
+                file.interval = min_interval
+            else:
+                # Quiet files get checked less and less often
+                file.interval = min(file.interval * 2,
+                                    max_interval)
+
+            heapq.heappush(
+                schedule, (now + file.interval, index))
+
+        if schedule:
+            delay = schedule[0][0] - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    return stat_calls
+
+def run_multiplexed(handles, output_path, max_interval=1.0):
+    with open(output_path, 'wb') as output:
+        # Only one thread writes, so there's no lock
+        return tail_many(handles, output.writelines,
+                         max_interval=max_interval)
+
+
+# Example 17
+input_paths = ...
+handles = ...
+output_path = ...
+
+tmpdir, input_paths, handles, output_path = setup()
+
+run_multiplexed(handles, output_path, max_interval=0.1)
+
+confirm_merge(input_paths, output_path)
+
+tmpdir.cleanup()
+
+
+# Example 18
+def write_to_some(paths, write_count, active_count):
+    active = random.sample(paths, active_count)
+    for i in range(write_count):
+        path = random.choice(active)
+        with open(path, 'ab') as f:
+            f.write(f'{path}-{i:04}\n'.encode())
+        time.sleep(0.001)
+
+with TemporaryDirectory() as tmpdir:
+    input_paths = []
+    for i in range(2000):
+        # Same width names so none is a prefix of another
+        path = os.path.join(tmpdir, f'{i:04}')
+        open(path, 'wb').close()
+        input_paths.append(path)
+    handles = [open(path, 'rb') for path in input_paths]
+
+    writer = Thread(target=write_to_some,
+                    args=(input_paths, 500, 20))
+    writer.start()
+    Thread(target=lambda: (writer.join(), close_all(handles))
+           ).start()
+
+    output_path = os.path.join(tmpdir, 'merged')
+    start = time.perf_counter()
+    stat_calls = run_multiplexed(handles, output_path)
+    delta = time.perf_counter() - start
+
+    with open(output_path, 'rb') as f:
+        merged_count = len(f.readlines())
+
+    print(f'{len(handles)} files in one thread: '
+          f'{merged_count} lines, {stat_calls} fstat calls '
+          f'in {delta:.1f}s')
+    confirm_merge(input_paths, output_path)
+
+
+# Example 19
+import functools
+import itertools
+
+class OrderedMerger:
+    def __init__(self, input_count, write_func, extract_time,
+                 max_lateness=1.0, window=1000):
+        self.write_func = write_func
+        self.extract_time = extract_time
+        self.max_lateness = max_lateness
+        self.window = window
+        self.lock = Lock()
+        self.heap = []
+        self.counter = itertools.count()  # Ties keep arrival order
+        self.latest = [None] * input_count
+        # (arrival time, timestamp) of each buffered line, per
+        # input and oldest first; at most window long each
+        self.buffered = [collections.deque()
+                         for _ in range(input_count)]
+        self.open = set(range(input_count))
+        self.emitted = None  # Newest timestamp written so far
+        self.late = 0
+
+    def add(self, index, lines):
+        with self.lock:
+            arrival = time.monotonic()
+            for line in lines:
+                stamp = self.extract_time(line)
+                entry = (stamp, next(self.counter), index, line)
+                heapq.heappush(self.heap, entry)
+                self.buffered[index].append((arrival, stamp))
+                self.latest[index] = stamp
+            while len(self.buffered[index]) > self.window:
+                self.write_func([self._pop()])
+            self._emit_ready()
+
+    def close_input(self, index):
+        with self.lock:
+            self.open.discard(index)
+            self._emit_ready()
+
+    def flush_expired(self):
+        with self.lock:
+            self._emit_ready()
+
+    def _cutoff(self):
+        # Returns the newest timestamp that is safe to write,
+        # None for nothing, or True for everything.
+        stamps = [self.latest[i] for i in self.open]
+        if not stamps:
+            return True
+
+        cutoff = None
+        if None not in stamps:
+            # Each input is in time order, so nothing older than
+            # the newest line from the slowest input can come.
+            cutoff = min(stamps)
+
+        # Lines that arrived more than max_lateness ago go out
+        # anyway, along with everything that sorts before them.
+        # Only the arrival times come from this host's clock, so
+        # timestamps can be any comparable type.
+        expired = time.monotonic() - self.max_lateness
+        for buffered in self.buffered:
+            for arrival, stamp in buffered:
+                if arrival > expired:
+                    break
+                if cutoff is None or stamp > cutoff:
+                    cutoff = stamp
+        return cutoff
+
+    def _pop(self):
+        stamp, _, index, line = heapq.heappop(self.heap)
+        # Inputs are in time order, so this was its oldest line
+        self.buffered[index].popleft()
+        if self.emitted is not None and stamp < self.emitted:
+            self.late += 1
+        else:
+            self.emitted = stamp
+        return line
+
+    def _emit_ready(self):
+        cutoff = self._cutoff()
+        if cutoff is None:
+            return
+        ready = []
+        while self.heap and (cutoff is True or
+                             self.heap[0][0] <= cutoff):
+            ready.append(self._pop())
+        if ready:
+            self.write_func(ready)
+
+def run_threads_ordered(handles, interval, output_path,
+                        extract_time, max_lateness=1.0):
+    with open(output_path, 'wb') as output:
+        merger = OrderedMerger(
+            len(handles), output.writelines, extract_time,
+            max_lateness=max_lateness)
+
+        def tail(index, handle):
+            write = functools.partial(merger.add, index)
+            try:
+                tail_file_bulk(handle, interval, write)
+            finally:
+                merger.close_input(index)
+
+        threads = []
+        for index, handle in enumerate(handles):
+            thread = Thread(target=tail, args=(index, handle))
+            thread.start()
+            threads.append(thread)
+
+        while any(thread.is_alive() for thread in threads):
+            merger.flush_expired()
+            time.sleep(interval)
+
+        for thread in threads:
+            thread.join()
+
+        # Write whatever is left before the output closes
+        for index in range(len(handles)):
+            merger.close_input(index)
+
+    return merger
+
+
+# Example 20
+def write_timestamped_data(path, write_count, interval):
+    with open(path, 'wb') as f:
+        for i in range(write_count):
+            time.sleep(random.random() * interval)
+            data = f'{path}-{i:02}-{time.time():.6f}\n'
+            f.write(data.encode())
+            f.flush()
+
+def line_time(line):
+    return float(line.rsplit(b'-', 1)[1])
+
+def setup_timestamped():
+    tmpdir = TemporaryDirectory()
+    input_paths = []
+    for i in range(5):
+        path = os.path.join(tmpdir.name, str(i))
+        open(path, 'w').close()
+        input_paths.append(path)
+        args = (path, 10, 0.1)
+        Thread(target=write_timestamped_data, args=args).start()
+
+    handles = [open(path, 'rb') for path in input_paths]
+    Thread(target=close_all, args=(handles,)).start()
+
+    output_path = os.path.join(tmpdir.name, 'merged')
+    return tmpdir, input_paths, handles, output_path
+
+for max_lateness in (10, 0):
+    tmpdir, input_paths, handles, output_path = (
+        setup_timestamped())
+
+    merger = run_threads_ordered(
+        handles, 0.01, output_path, line_time,
+        max_lateness=max_lateness)
+
+    confirm_merge(input_paths, output_path)
+    with open(output_path, 'rb') as f:
+        stamps = [line_time(line) for line in f]
+    if max_lateness:
+        assert stamps == sorted(stamps)
+        assert merger.late == 0
+    print(f'Max lateness {max_lateness}s: '
+          f'{merger.late} of {len(stamps)} lines out of order')
+
+    tmpdir.cleanup()
+
+# Timestamps only need to sort, not match this host's clock
+from datetime import datetime
+
+def iso_time(line):
+    return datetime.fromisoformat(line.split()[0].decode())
+
+output = []
+merger = OrderedMerger(2, output.extend, iso_time,
+                       max_lateness=60)
+merger.add(0, [b'1999-12-31T23:59:01 a\n',
+               b'1999-12-31T23:59:03 a\n'])
+assert output == []
+merger.add(1, [b'1999-12-31T23:59:02 b\n'])
+assert output == [b'1999-12-31T23:59:01 a\n',
+                  b'1999-12-31T23:59:02 b\n']
+merger.close_input(1)
+assert output[-1] == b'1999-12-31T23:59:03 a\n'
+assert not any(merger.buffered)
+
+merger = OrderedMerger(2, output.extend, iso_time,
+                       max_lateness=0.1)
+merger.add(0, [b'1999-12-31T23:59:04 a\n'])
+merger.flush_expired()
+assert len(output) == 3
+time.sleep(0.2)
+merger.flush_expired()
+assert output[-1] == b'1999-12-31T23:59:04 a\n'
+
+# A tail thread that dies still closes its input
+import threading
+
+def number_time(line):
+    return float(line.split()[1])
+
+with TemporaryDirectory() as tmpdir:
+    input_paths = [os.path.join(tmpdir, name)
+                   for name in ('0', '1')]
+    with open(input_paths[0], 'wb') as f:
+        f.write(b'0 1.0\n')
+    with open(input_paths[1], 'wb') as f:
+        f.write(b'1 5.0\nbroken\n')
+
+    handles = [open(path, 'rb') for path in input_paths]
+    Thread(target=close_all, args=(handles,)).start()
+
+    failures = []
+    old_hook = threading.excepthook
+    threading.excepthook = failures.append
+    try:
+        output_path = os.path.join(tmpdir, 'merged')
+        run_threads_ordered(handles, 0.01, output_path,
+                            number_time, max_lateness=10)
+    finally:
+        threading.excepthook = old_hook
+
+    assert [f.exc_type for f in failures] == [IndexError]
+    with open(output_path, 'rb') as f:
+        assert f.read() == b'0 1.0\n1 5.0\n'
@@ -250,3 +250,140 @@ asyncio.run(run_fully_async(handles, 0.1, output_path))
 confirm_merge(input_paths, output_path)
 
 tmpdir.cleanup()
+
+
+# Example 10
+class BufferedWriteThread(WriteThread):
+    def __init__(self, output_path, max_bytes=64 * 1024,
+                 max_delay=0.05):
+        super().__init__(output_path)
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        # Only touched from the event loop that calls write()
+        self.pending = []
+        self.pending_bytes = 0
+        self.timer = None
+        self.in_flight = []
+
+    async def real_writelines(self, lines):
+        self.output.writelines(lines)
+
+    def hand_off(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return None
+
+        lines = self.pending
+        self.pending = []
+        self.pending_bytes = 0
+        coro = self.real_writelines(lines)
+        # Batches run in the order they are handed off
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        # Kept so errors from timer batches aren't lost
+        self.in_flight.append(future)
+        return future
+
+    def raise_errors(self):
+        done = [f for f in self.in_flight if f.done()]
+        self.in_flight = [f for f in self.in_flight if not f.done()]
+        for future in done:
+            future.result()
+
+    async def write(self, data):
+        self.raise_errors()
+        self.pending.append(data)
+        self.pending_bytes += len(data)
+        if self.pending_bytes >= self.max_bytes:
+            await self.flush()
+        elif self.timer is None:
+            loop = asyncio.get_running_loop()
+            self.timer = loop.call_later(
+                self.max_delay, self.hand_off)
+
+    async def flush(self):
+        self.hand_off()
+        in_flight, self.in_flight = self.in_flight, []
+        for future in in_flight:
+            await asyncio.wrap_future(future)
+
+    async def stop(self):
+        try:
+            await self.flush()
+        finally:
+            await super().stop()
+
+
+# Example 11
+async def run_fully_async_buffered(handles, interval,
+                                   output_path):
+    async with BufferedWriteThread(output_path) as output:
+        tasks = []
+        for handle in handles:
+            coro = tail_async(handle, interval, output.write)
+            task = asyncio.create_task(coro)
+            tasks.append(task)
+
+        await asyncio.gather(*tasks)
+
+input_paths = ...
+handles = ...
+output_path = ...
+
+tmpdir, input_paths, handles, output_path = setup()
+
+asyncio.run(run_fully_async_buffered(handles, 0.1, output_path))
+
+confirm_merge(input_paths, output_path)
+
+tmpdir.cleanup()
+
+
+# Example 12
+async def write_lines(thread_type, output_path, count):
+    start = time.perf_counter()
+    async with thread_type(output_path) as output:
+        for i in range(count):
+            await output.write(f'line {i}\n'.encode())
+    # Includes flushing whatever is still buffered
+    return time.perf_counter() - start
+
+with TemporaryDirectory() as tmpdir:
+    for thread_type in (WriteThread, BufferedWriteThread):
+        path = os.path.join(tmpdir, thread_type.__name__)
+        delta = asyncio.run(write_lines(thread_type, path, 50_000))
+        with open(path, 'rb') as f:
+            lines = f.readlines()
+        assert lines == [f'line {i}\n'.encode()
+                         for i in range(50_000)]
+        print(f'{thread_type.__name__}: '
+              f'{50_000 / delta:,.0f} lines/second')
+
+# Errors from batches the timer hands off still surface
+class FailingWriteThread(BufferedWriteThread):
+    async def real_writelines(self, lines):
+        raise OSError('Disk full')
+
+async def write_after_failure(output_path):
+    async with FailingWriteThread(output_path) as output:
+        await output.write(b'first\n')
+        await asyncio.sleep(output.max_delay * 4)
+        try:
+            await output.write(b'second\n')
+        except OSError as e:
+            return str(e)
+
+async def stop_after_failure(output_path):
+    try:
+        async with FailingWriteThread(output_path) as output:
+            await output.write(b'first\n')
+    except OSError as e:
+        return str(e)
+
+with TemporaryDirectory() as tmpdir:
+    path = os.path.join(tmpdir, 'failing')
+    error = asyncio.run(write_after_failure(path))
+    assert error == 'Disk full', error
+    error = asyncio.run(stop_after_failure(path))
+    assert error == 'Disk full', error